@@ -1,5 +1,9 @@
 import os
+import csv
+import hashlib
+import io
 import subprocess
+import tempfile
 import json
 import time
 import uuid
@@ -10,13 +14,20 @@ from pathlib import Path
 
 import requests
 import pandas as pd
-from flask import Flask, render_template, request, jsonify, send_file
+from flask import Flask, Response, render_template, request, jsonify, send_file
 from flask_cors import CORS
-from sqlalchemy import create_engine, Column, Integer, String, Float, DateTime, Text
+from sqlalchemy import create_engine, select, update, func, Column, Integer, String, Float, DateTime, Text
 from sqlalchemy.orm import declarative_base, sessionmaker
 from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.engine.url import make_url
 
+try:
+    import orjson
+except ImportError:  # optional speedup; stdlib json is the fallback
+    orjson = None
+
+_json_loads = orjson.loads if orjson else json.loads
+
 # --- app / logging ---------------------------------------------------------
 app = Flask(__name__, static_folder='frontend/build', template_folder='templates')
 CORS(app, resources={r"/*": {"origins": "*"}})  # safe for local/dev; restrict in prod
@@ -98,6 +109,17 @@ def _save_products_to_db(products, search_term=None):
 
     try:
         with SessionLocal() as session:
+            # one Core SELECT for every link in the batch instead of an ORM
+            # query per product; rows stay plain tuples (no identity map)
+            links = list({p.get('link') for p in products if p.get('link')})
+            existing_rows = {}
+            if links:
+                stmt = select(
+                    Product.link, Product.id, Product.name, Product.price, Product.image, Product.description
+                ).where(Product.link.in_(links))
+                for row in session.execute(stmt):
+                    existing_rows[row.link] = row._asdict()
+
             for p in products:
                 link = p.get('link')
                 name = p.get('name')
@@ -108,20 +130,21 @@ def _save_products_to_db(products, search_term=None):
 
                 is_complete = 1 if (name and price is not None and (image or images) and link) else 0
 
-                existing = None
-                if link:
-                    existing = session.query(Product).filter_by(link=link).first()
+                existing = existing_rows.get(link) if link else None
 
                 if existing:
-                    existing.name = name or existing.name
-                    existing.price = price if price is not None else existing.price
-                    existing.image = image or existing.image
-                    existing.description = p.get('description') or existing.description
-                    existing.is_complete = is_complete
-                    existing.scraped_at = datetime.utcnow()
-                    existing.raw = raw
-                    session.add(existing)
-                    prod_id = existing.id
+                    values = {
+                        'name': name or existing['name'],
+                        'price': price if price is not None else existing['price'],
+                        'image': image or existing['image'],
+                        'description': p.get('description') or existing['description'],
+                        'is_complete': is_complete,
+                        'scraped_at': datetime.utcnow(),
+                        'raw': raw,
+                    }
+                    prod_id = existing['id']
+                    session.execute(update(Product).where(Product.id == prod_id).values(**values))
+                    existing.update(values)
                     logger.info('Updated product id=%s link=%s is_complete=%s', prod_id, link, bool(is_complete))
                     saved.append({'id': prod_id, 'action': 'updated', 'is_complete': bool(is_complete)})
                 else:
@@ -140,6 +163,11 @@ def _save_products_to_db(products, search_term=None):
                     session.add(prod)
                     session.flush()
                     prod_id = prod.id
+                    if link:
+                        existing_rows[link] = {
+                            'link': link, 'id': prod_id, 'name': name, 'price': price,
+                            'image': image, 'description': p.get('description'),
+                        }
                     logger.info('Created product id=%s link=%s is_complete=%s', prod_id, link, bool(is_complete))
                     saved.append({'id': prod_id, 'action': 'created', 'is_complete': bool(is_complete)})
 
@@ -189,6 +217,63 @@ def _save_products_to_db(products, search_term=None):
 
 
 # --- captcha helpers & interactive/manual solve ----------------------------
+_CAPTCHA_MARKERS = (
+    'robot or human',
+    'are you a robot',
+    'please verify',
+    'challenge',
+    '/blocked?url=',
+    'px-cloud',
+    'captcha',
+)
+
+# price patterns for the interactive card parser, compiled once at import
+_PRICE_LABELED_DECIMAL_RE = re.compile(
+    r"(?:now|clearance|reduced(?:\s+from)?|sale(?:\s+price)?)\s*\$?\s*([0-9][0-9,]*\.[0-9]{2})", re.IGNORECASE
+)
+_PRICE_LABELED_COMPACT_RE = re.compile(
+    r"(?:now|clearance|reduced(?:\s+from)?|sale(?:\s+price)?)\s*\$?\s*([0-9][0-9,]{2,})", re.IGNORECASE
+)
+_PRICE_CURRENT_RE = re.compile(r"current\s+price\s*\$?\s*([0-9][0-9,]*\.[0-9]{2})", re.IGNORECASE)
+_PRICE_CURRENT_LABEL_RE = re.compile(r"current\s+price", re.IGNORECASE)
+_PRICE_DECIMAL_CURRENCY_RE = re.compile(r"\$\s*([0-9][0-9,]*\.[0-9]{1,2})")
+_PRICE_DECIMAL_RE = re.compile(r"\b([0-9][0-9,]*\.[0-9]{2})\b")
+_PRICE_COMPACT_CURRENCY_RE = re.compile(r"\$\s*([0-9][0-9,]*)")
+
+# whitespace collapsing and the interactive title cleaner's price-line checks
+_WS_RE = re.compile(r'\s+')
+_PRICE_LINE_DOLLAR_RE = re.compile(r'\$\s*[0-9]')
+_PRICE_LINE_LABEL_RE = re.compile(r'\bcurrent\s+price\b|\bwas\s+\$|\bnow\s+\$|\bclearance\b|\bsale\b')
+_PRICE_LINE_SHIPPING_RE = re.compile(r'^\+?\$[0-9]+(?:\.[0-9]{2})?\s+shipping$')
+_PRICE_LINE_UNIT_RE = re.compile(r'^[0-9]+(?:\.[0-9]{2})?\s*/\s*ea$')
+_TITLE_TRAILING_PRICE_RE = re.compile(r'\s+\$[0-9][0-9,]*(?:\.[0-9]{2})?(?:\s*/\s*ea)?\s*$')
+_TITLE_TRAILING_LABELED_PRICE_RE = re.compile(
+    r'\s+(?:current\s+price|now|was|clearance|sale)\s+\$[0-9][0-9,]*(?:\.[0-9]{2})?\s*$', re.IGNORECASE
+)
+_TITLE_PRICE_TAIL_RE = re.compile(r'\s+\$[0-9][0-9,]*(?:\.[0-9]{2})?.*$')
+
+# Interactive card fields are resolved in page JS so each card costs one
+# Playwright round trip instead of one per fallback selector; the title
+# selectors are still tried in priority order.
+_CARD_TITLE_SELECTORS = ['span.normal', 'span[data-automation-id="product-title"]', 'a > span', 'h2']
+_FIRST_MATCH_TEXT_JS = """
+(el, selectors) => {
+    for (const sel of selectors) {
+        const node = el.querySelector(sel);
+        if (node) return node.innerText;
+    }
+    return null;
+}
+"""
+_CARD_IMAGE_LINK_JS = """
+el => {
+    const img = el.querySelector('img');
+    const a = el.querySelector('a');
+    return [img ? img.getAttribute('src') : null, a ? a.getAttribute('href') : null];
+}
+"""
+
+
 def detect_captcha(html: str) -> bool:
     """Rudimentary detection of bot/challenge pages using keywords.
 
@@ -197,16 +282,7 @@ def detect_captcha(html: str) -> bool:
     if not html:
         return False
     s = html.lower()
-    checks = [
-        'robot or human',
-        'are you a robot',
-        'please verify',
-        'challenge',
-        '/blocked?url=',
-        'px-cloud',
-        'captcha',
-    ]
-    return any(k in s for k in checks)
+    return any(m in s for m in _CAPTCHA_MARKERS)
 
 
 @app.route('/captcha/debug/<filename>')
@@ -368,22 +444,14 @@ def captcha_interactive():
                     return None
                 s = str(text).replace('\xa0', ' ').strip()
                 # Highest priority: discounted labels (Now/Clearance/Reduced/Sale)
-                labeled_decimal = re.search(
-                    r"(?:now|clearance|reduced(?:\s+from)?|sale(?:\s+price)?)\s*\$?\s*([0-9][0-9,]*\.[0-9]{2})",
-                    s,
-                    flags=re.IGNORECASE,
-                )
+                labeled_decimal = _PRICE_LABELED_DECIMAL_RE.search(s)
                 if labeled_decimal:
                     try:
                         return float(labeled_decimal.group(1).replace(',', ''))
                     except Exception:
                         return None
 
-                labeled_compact = re.search(
-                    r"(?:now|clearance|reduced(?:\s+from)?|sale(?:\s+price)?)\s*\$?\s*([0-9][0-9,]{2,})",
-                    s,
-                    flags=re.IGNORECASE,
-                )
+                labeled_compact = _PRICE_LABELED_COMPACT_RE.search(s)
                 if labeled_compact:
                     try:
                         raw = labeled_compact.group(1).replace(',', '')
@@ -392,7 +460,7 @@ def captcha_interactive():
                         return None
 
                 # Walmart often includes "current price $10.29" in the same node.
-                current_price_match = re.search(r"current\s+price\s*\$?\s*([0-9][0-9,]*\.[0-9]{2})", s, flags=re.IGNORECASE)
+                current_price_match = _PRICE_CURRENT_RE.search(s)
                 if current_price_match:
                     try:
                         return float(current_price_match.group(1).replace(',', ''))
@@ -400,7 +468,7 @@ def captcha_interactive():
                         return None
 
                 # Prefer explicit decimal currency matches.
-                decimal_currency = re.findall(r"\$\s*([0-9][0-9,]*\.[0-9]{1,2})", s)
+                decimal_currency = _PRICE_DECIMAL_CURRENCY_RE.findall(s)
                 if decimal_currency:
                     try:
                         return float(decimal_currency[-1].replace(',', ''))
@@ -408,7 +476,7 @@ def captcha_interactive():
                         return None
 
                 # Fallback for any decimal number in text.
-                m2 = re.search(r"\b([0-9][0-9,]*\.[0-9]{2})\b", s)
+                m2 = _PRICE_DECIMAL_RE.search(s)
                 if m2:
                     try:
                         return float(m2.group(1).replace(',', ''))
@@ -417,11 +485,11 @@ def captcha_interactive():
 
                 # Last resort: integer-looking currency amount (e.g. "$1029").
                 # If "current price" exists in the same text, this value is usually cents.
-                compact_currency = re.findall(r"\$\s*([0-9][0-9,]*)", s)
+                compact_currency = _PRICE_COMPACT_CURRENCY_RE.findall(s)
                 if compact_currency:
                     num = compact_currency[-1].replace(',', '')
                     try:
-                        if re.search(r"current\s+price", s, flags=re.IGNORECASE) and len(num) >= 3:
+                        if _PRICE_CURRENT_LABEL_RE.search(s) and len(num) >= 3:
                             return float(num) / 100.0
                         return float(num)
                     except Exception:
@@ -435,18 +503,18 @@ def captcha_interactive():
                     logger.debug('Interactive title clean item=%d success=False reason=empty_raw run_id=%s', item_idx, scrape_run_id)
                     return 'Unknown Item'
 
-                lines = [re.sub(r'\s+', ' ', ln).strip() for ln in raw.splitlines()]
+                lines = [_WS_RE.sub(' ', ln).strip() for ln in raw.splitlines()]
                 lines = [ln for ln in lines if ln]
 
                 def _looks_like_price_line(s):
                     low = s.lower()
-                    if re.search(r'\$\s*[0-9]', s):
+                    if _PRICE_LINE_DOLLAR_RE.search(s):
                         return True
-                    if re.search(r'\bcurrent\s+price\b|\bwas\s+\$|\bnow\s+\$|\bclearance\b|\bsale\b', low):
+                    if _PRICE_LINE_LABEL_RE.search(low):
                         return True
-                    if re.search(r'^\+?\$[0-9]+(?:\.[0-9]{2})?\s+shipping$', low):
+                    if _PRICE_LINE_SHIPPING_RE.search(low):
                         return True
-                    if re.search(r'^[0-9]+(?:\.[0-9]{2})?\s*/\s*ea$', low):
+                    if _PRICE_LINE_UNIT_RE.search(low):
                         return True
                     return False
 
@@ -463,14 +531,14 @@ def captcha_interactive():
                     candidate = lines[0] if lines else raw
 
                 # Remove trailing price fragments still attached to the same line.
-                candidate = re.sub(r'\s+\$[0-9][0-9,]*(?:\.[0-9]{2})?(?:\s*/\s*ea)?\s*$', '', candidate)
-                candidate = re.sub(r'\s+(?:current\s+price|now|was|clearance|sale)\s+\$[0-9][0-9,]*(?:\.[0-9]{2})?\s*$', '', candidate, flags=re.IGNORECASE)
-                candidate = re.sub(r'\s+', ' ', candidate).strip(' -\t\r\n')
+                candidate = _TITLE_TRAILING_PRICE_RE.sub('', candidate)
+                candidate = _TITLE_TRAILING_LABELED_PRICE_RE.sub('', candidate)
+                candidate = _WS_RE.sub(' ', candidate).strip(' -\t\r\n')
 
                 # Last-ditch protection: if candidate is still mostly price-y, use raw first token line.
                 if _looks_like_price_line(candidate):
-                    fallback = re.sub(r'\s+', ' ', (lines[0] if lines else raw)).strip()
-                    candidate = re.sub(r'\s+\$[0-9][0-9,]*(?:\.[0-9]{2})?.*$', '', fallback).strip()
+                    fallback = _WS_RE.sub(' ', (lines[0] if lines else raw)).strip()
+                    candidate = _TITLE_PRICE_TAIL_RE.sub('', fallback).strip()
 
                 cleaned = candidate or 'Unknown Item'
                 logger.debug(
@@ -612,16 +680,16 @@ def captcha_interactive():
                             node = card_el.query_selector(selector)
                             txt = (node.inner_text() or '').strip() if node else ''
                             if txt:
-                                txt = re.sub(r'\s+', ' ', txt).strip()
+                                txt = _WS_RE.sub(' ', txt).strip()
                                 # remove duplicated section heading prefix
                                 txt = re.sub(r'^\s*product details\s*[:\-]?\s*', '', txt, flags=re.IGNORECASE)
                             # reject title-only / near-title strings
-                            name_norm = re.sub(r'\s+', ' ', (product_name or '').strip()).lower()
+                            name_norm = _WS_RE.sub(' ', (product_name or '').strip()).lower()
                             txt_norm = (txt or '').lower()
                             too_similar_to_title = bool(name_norm and (txt_norm == name_norm or txt_norm.startswith(name_norm)) and len(txt_norm) <= len(name_norm) + 18)
 
                             if txt and len(txt) >= 40 and not too_similar_to_title:
-                                clean = re.sub(r'\s+', ' ', txt).strip()
+                                clean = _WS_RE.sub(' ', txt).strip()
                                 logger.info(
                                     'Interactive quick description extracted item=%d round=%d attempt=%d selector=%s chars=%d run_id=%s',
                                     item_idx, round_no, selector_attempt, selector, len(clean), scrape_run_id
@@ -648,7 +716,7 @@ def captcha_interactive():
                 # Fallback: derive a clean sentence from card text without title/price noise.
                 try:
                     raw = (card_el.inner_text() or '').strip()
-                    lines = [re.sub(r'\s+', ' ', ln).strip() for ln in raw.splitlines()]
+                    lines = [_WS_RE.sub(' ', ln).strip() for ln in raw.splitlines()]
                     filtered = []
                     name_norm = (product_name or '').strip().lower()
                     for ln in lines:
@@ -733,7 +801,7 @@ def captcha_interactive():
                     hm = re.search(r'Key\s*Item\s*Features', html, flags=re.IGNORECASE)
                     if hm:
                         ctx = html[max(0, hm.start() - 220): min(len(html), hm.start() + 320)]
-                        ctx = re.sub(r'\s+', ' ', ctx).strip()
+                        ctx = _WS_RE.sub(' ', ctx).strip()
                         logger.debug(
                             'Interactive key-features heading context item=%d run_id=%s snippet="%s"',
                             item_idx, scrape_run_id, ctx[:280]
@@ -750,7 +818,7 @@ def captcha_interactive():
                     txt = re.sub(r'&amp;', '&', txt)
                     txt = re.sub(r'&quot;|&#34;', '"', txt)
                     txt = re.sub(r'&#39;|&apos;', "'", txt)
-                    txt = re.sub(r'\s+', ' ', txt).strip()
+                    txt = _WS_RE.sub(' ', txt).strip()
                     return txt
 
                 def _format_feature_list(raw_items):
@@ -844,7 +912,7 @@ def captcha_interactive():
                         clean_items = []
                         for q in quoted:
                             txt = q.encode('utf-8').decode('unicode_escape', errors='ignore')
-                            txt = re.sub(r'\s+', ' ', txt).strip()
+                            txt = _WS_RE.sub(' ', txt).strip()
                             if txt and len(txt) >= 4:
                                 clean_items.append(txt)
                             if len(clean_items) >= 8:
@@ -875,8 +943,8 @@ def captcha_interactive():
             for i, el in enumerate(elems[:num_products]):
                 try:
                     # TITLE: multiple fallbacks
-                    name_el = el.query_selector('span.normal') or el.query_selector('span[data-automation-id="product-title"]') or el.query_selector('a > span') or el.query_selector('h2')
-                    raw_name = name_el.inner_text().strip() if name_el else 'Unknown Item'
+                    raw_title = el.evaluate(_FIRST_MATCH_TEXT_JS, _CARD_TITLE_SELECTORS)
+                    raw_name = raw_title.strip() if raw_title is not None else 'Unknown Item'
                     name = _clean_title_text(raw_name, i)
 
                     # PRICE: multi-selector attempts + full-card regex fallback
@@ -944,13 +1012,8 @@ def captcha_interactive():
 
                     logger.debug('Interactive parse - item %d raw price: "%s"', i, raw_price_text)
 
-                    # IMAGE
-                    img_el = el.query_selector('img')
-                    image = img_el.get_attribute('src') if img_el else None
-
-                    # LINK
-                    link_el = el.query_selector('a')
-                    raw_link = link_el.get_attribute('href') if link_el else None
+                    # IMAGE + LINK
+                    image, raw_link = el.evaluate(_CARD_IMAGE_LINK_JS)
                     link = _normalize_product_link(raw_link)
                     logger.debug('Interactive link parse item=%d run_id=%s raw_link=%s normalized_link=%s', i, scrape_run_id, raw_link, link)
 
@@ -1042,10 +1105,11 @@ def scrape():
     )
 
     def _load_scrapy_output(path):
-        with open(path, 'r', encoding='utf-8') as f:
+        # raw bytes straight into the decoder; orjson parses UTF-8 natively
+        with open(path, 'rb') as f:
             content = f.read()
         try:
-            return json.loads(content)
+            return _json_loads(content)
         except json.JSONDecodeError:
             parsed = []
             for line in content.splitlines():
@@ -1053,9 +1117,9 @@ def scrape():
                 if not line:
                     continue
                 try:
-                    parsed.append(json.loads(line))
+                    parsed.append(_json_loads(line))
                 except Exception:
-                    logger.warning('run_id=%s failed to parse scrapy output line: %s', scrape_run_id, line[:200])
+                    logger.warning('run_id=%s failed to parse scrapy output line: %s', scrape_run_id, line[:200].decode('utf-8', 'replace'))
             logger.warning('run_id=%s scrapy JSON malformed; parsed %d JSONL rows', scrape_run_id, len(parsed))
             return parsed
 
@@ -1232,20 +1296,127 @@ def list_products():
         ]
     return jsonify(out)
 
+_EXPORT_COLUMNS = (Product.id, Product.name, Product.price, Product.link, Product.image, Product.scraped_at)
+
+
+def _export_snapshot(conn):
+    """Return (etag, last_scraped) for the products table as seen by `conn`.
+
+    The row count is folded in next to MAX(scraped_at) so rows that commit
+    out of order (an older scraped_at landing after a newer one) still
+    change the key. Returns (None, None) when the table is empty.
+    """
+    count, last = conn.execute(select(func.count(Product.id), func.max(Product.scraped_at))).one()
+    if last is None:
+        return None, None
+    return hashlib.md5(f'{count}:{last}'.encode()).hexdigest(), last
+
+
+def _export_path(etag):
+    """Cached DB export for the snapshot identified by `etag`."""
+    return WALMART_DIR / f'products_db_export.{etag}.csv'
+
+
+def _stream_export_csv(chunk_size=5000):
+    """Yield the DB export as CSV text, one partition of rows at a time.
+
+    Rows are read with a server-side cursor and each chunk is also appended
+    to a temp file. The snapshot key is read on the same connection before
+    the rows, and once the stream completes the temp file is published as
+    `_export_path(key)`, so a cached export is only ever reused for the
+    exact snapshot it was built from. Each stream gets its own temp file,
+    so concurrent downloads never share a partial export.
+    """
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    completed = False
+    with engine.connect().execution_options(stream_results=True) as conn:
+        # key first: rows committed in between only make the file newer
+        # than its key, which at worst costs a rebuild, never a stale hit
+        etag, _ = _export_snapshot(conn)
+        csv_path = _export_path(etag)
+        cache = tempfile.NamedTemporaryFile(
+            'w', encoding='utf-8', newline='', dir=csv_path.parent,
+            prefix=csv_path.name + '.', suffix='.tmp', delete=False,
+        )
+        tmp_path = Path(cache.name)
+        try:
+            writer.writerow([c.key for c in _EXPORT_COLUMNS])
+            for rows in conn.execute(select(*_EXPORT_COLUMNS)).partitions(chunk_size):
+                writer.writerows(rows)
+                chunk = buf.getvalue()
+                buf.seek(0)
+                buf.truncate()
+                cache.write(chunk)
+                yield chunk
+            chunk = buf.getvalue()
+            if chunk:
+                cache.write(chunk)
+                yield chunk
+            completed = True
+        finally:
+            cache.close()
+            if completed:
+                os.replace(tmp_path, csv_path)
+                for old in csv_path.parent.glob('products_db_export.*.csv'):
+                    if old != csv_path:
+                        # may still be open in another download on Windows
+                        try:
+                            old.unlink()
+                        except OSError:
+                            pass
+            else:
+                # client went away mid-stream; never publish a partial export
+                tmp_path.unlink(missing_ok=True)
+
+
 @app.route('/products/download_csv')
 def download_products_csv():
-    with SessionLocal() as session:
-        products = session.query(Product).all()
-        if not products:
-            return 'No products in database.', 404
-        rows = [
-            {'id': p.id, 'name': p.name, 'price': p.price, 'link': p.link, 'image': p.image, 'scraped_at': p.scraped_at}
-            for p in products
-        ]
-        df = pd.DataFrame(rows)
-        csv_path = WALMART_DIR / 'products_db_export.csv'
-        df.to_csv(csv_path, index=False)
-    return send_file(csv_path, as_attachment=True)
+    with engine.connect() as conn:
+        etag, last = _export_snapshot(conn)
+    if etag is None:
+        return 'No products in database.', 404
+    if request.if_none_match.contains(etag):
+        return Response(status=304)
+    csv_path = _export_path(etag)
+    download_name = 'products_db_export.csv'
+    if csv_path.is_file():
+        return send_file(
+            csv_path, as_attachment=True, download_name=download_name,
+            conditional=True, etag=etag, last_modified=last,
+        )
+    logger.info('Streaming DB CSV export (no cached export for snapshot %s)', etag)
+    resp = Response(_stream_export_csv(), mimetype='text/csv')
+    resp.headers['Content-Disposition'] = f'attachment; filename={download_name}'
+    resp.set_etag(etag)
+    resp.last_modified = last
+    return resp
+
+def _stream_json_to_csv(json_path, csv_path):
+    """Convert a scrapy JSON array export to CSV one record at a time.
+
+    Uses ijson when available so the input is never fully materialized; the
+    header comes from the first record's keys.
+    """
+    try:
+        import ijson
+    except ImportError:
+        ijson = None
+
+    with open(json_path, 'rb') as f, open(csv_path, 'w', encoding='utf-8', newline='') as out:
+        records = ijson.items(f, 'item') if ijson else iter(json.load(f))
+        first = next(records, None)
+        if first is None:
+            return 0
+        writer = csv.DictWriter(out, fieldnames=list(first.keys()), restval='', extrasaction='ignore')
+        writer.writeheader()
+        writer.writerow(first)
+        count = 1
+        for rec in records:
+            writer.writerow(rec)
+            count += 1
+    return count
+
 
 # keep legacy JSON-download route for compatibility (reads latest file if present)
 @app.route('/download_csv')
@@ -1260,10 +1431,15 @@ def download_csv():
             return "Scraped data not found. Please run a search first.", 404
         json_path = files[0]
         csv_path = WALMART_DIR / 'scraped_data.csv'
-        with open(json_path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-        df = pd.DataFrame(data)
-        df.to_csv(csv_path, index=False)
+        if request.args.get('pandas') == 'true':
+            # pandas unions columns across records and coerces dtypes
+            with open(json_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            df = pd.DataFrame(data)
+            df.to_csv(csv_path, index=False)
+        else:
+            rows = _stream_json_to_csv(json_path, csv_path)
+            logger.info('Streamed %d rows from %s -> %s', rows, json_path, csv_path)
         return send_file(csv_path, as_attachment=True)
 
 if __name__ == '__main__':
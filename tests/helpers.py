@@ -0,0 +1,13 @@
+import fnmatch
+import os
+
+
+def latest_file(dir_, glob_pat):
+    """Newest file in `dir_` whose name matches `glob_pat`, or None."""
+    # single directory pass; DirEntry.stat() reuses the scandir result
+    try:
+        with os.scandir(dir_) as it:
+            cand = [(e.stat().st_mtime, e.path) for e in it if fnmatch.fnmatch(e.name, glob_pat)]
+    except FileNotFoundError:
+        return None
+    return max(cand, default=(None, None))[1]
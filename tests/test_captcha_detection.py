@@ -1,5 +1,4 @@
 import os
-import glob
 import sys
 
 # make project importable for tests
@@ -13,13 +12,14 @@ import json
 import pytest
 
 from app import detect_captcha
+from helpers import latest_file
 
 
 def _load_debug_html():
-    files = glob.glob('walmart_scraper/debug_wallet_*.html')
-    if not files:
+    path = latest_file('walmart_scraper', 'debug_wallet_*.html')
+    if not path:
         pytest.skip('no debug HTML saved (run a scrape with debug=true)')
-    with open(files[0], 'r', encoding='utf-8') as f:
+    with open(path, 'r', encoding='utf-8') as f:
         return f.read()
 
 
@@ -0,0 +1,102 @@
+from datetime import datetime
+
+import pytest
+
+import app as app_module
+from app import Base, Product, SessionLocal, engine
+
+
+@pytest.fixture
+def client(monkeypatch, tmp_path):
+    monkeypatch.setattr(app_module, 'WALMART_DIR', tmp_path)
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    return app_module.app.test_client()
+
+
+def _add_product(link, scraped_at):
+    with SessionLocal() as session:
+        session.add(Product(name='Wallet', price=9.99, link=link, scraped_at=scraped_at))
+        session.commit()
+
+
+def _cached_exports(dir_):
+    return sorted(dir_.glob('products_db_export.*.csv'))
+
+
+def test_download_csv_empty_db_is_404(client):
+    assert client.get('/products/download_csv').status_code == 404
+
+
+def test_download_csv_builds_then_serves_cached_export(client, tmp_path):
+    _add_product('https://www.walmart.com/ip/1', datetime(2024, 1, 1, 12, 0))
+
+    first = client.get('/products/download_csv')
+    assert first.status_code == 200
+    body = first.get_data(as_text=True)
+    assert 'https://www.walmart.com/ip/1' in body
+    etag = first.headers['ETag'].strip('"')
+    assert [p.name for p in _cached_exports(tmp_path)] == [f'products_db_export.{etag}.csv']
+
+    # unchanged snapshot: served from disk with the same validator
+    second = client.get('/products/download_csv')
+    assert second.status_code == 200
+    assert second.headers['ETag'].strip('"') == etag
+    assert second.get_data(as_text=True) == body
+    assert 'products_db_export.csv' in second.headers['Content-Disposition']
+
+
+def test_download_csv_if_none_match_is_304(client):
+    _add_product('https://www.walmart.com/ip/1', datetime(2024, 1, 1, 12, 0))
+    etag = client.get('/products/download_csv').headers['ETag']
+
+    resp = client.get('/products/download_csv', headers={'If-None-Match': etag})
+    assert resp.status_code == 304
+
+
+def test_download_csv_rebuilds_when_snapshot_changes(client, tmp_path):
+    _add_product('https://www.walmart.com/ip/1', datetime(2024, 1, 1, 12, 0))
+    old = client.get('/products/download_csv')
+    old_etag = old.headers['ETag']
+
+    # a row committing late with an *older* scraped_at leaves MAX(scraped_at)
+    # alone; the export must still be rebuilt rather than served from disk
+    _add_product('https://www.walmart.com/ip/2', datetime(2023, 6, 1, 12, 0))
+
+    resp = client.get('/products/download_csv', headers={'If-None-Match': old_etag})
+    assert resp.status_code == 200
+    assert resp.headers['ETag'] != old_etag
+    assert 'https://www.walmart.com/ip/2' in resp.get_data(as_text=True)
+
+
+def test_streamed_export_matches_cached_file(client, tmp_path):
+    for i in range(7):
+        _add_product(f'https://www.walmart.com/ip/{i}', datetime(2024, 1, 1, 12, i))
+
+    # small partitions so the body spans several chunks
+    streamed = ''.join(app_module._stream_export_csv(chunk_size=3))
+
+    cached = _cached_exports(tmp_path)
+    assert len(cached) == 1
+    assert cached[0].read_bytes().decode('utf-8') == streamed
+    assert streamed.count('\n') == 8  # header + 7 rows
+    assert not list(tmp_path.glob('*.tmp'))
+
+    # a newer snapshot replaces the superseded export
+    _add_product('https://www.walmart.com/ip/new', datetime(2024, 2, 1))
+    body = client.get('/products/download_csv').get_data(as_text=True)
+    cached = _cached_exports(tmp_path)
+    assert len(cached) == 1
+    assert cached[0].read_bytes().decode('utf-8') == body
+
+
+def test_abandoned_stream_publishes_nothing(client, tmp_path):
+    for i in range(4):
+        _add_product(f'https://www.walmart.com/ip/{i}', datetime(2024, 1, 1, 12, i))
+
+    stream = app_module._stream_export_csv(chunk_size=1)
+    next(stream)
+    stream.close()
+
+    assert not _cached_exports(tmp_path)
+    assert not list(tmp_path.glob('*.tmp'))
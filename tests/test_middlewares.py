@@ -0,0 +1,90 @@
+import os
+import sys
+
+# make project importable for tests
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+PKG_DIR = os.path.join(ROOT, 'walmart_scraper')
+if PKG_DIR not in sys.path:
+    sys.path.insert(0, PKG_DIR)
+
+import logging
+
+from scrapy import Request
+from scrapy.settings import Settings
+
+from walmart_scraper.middlewares import RotatingProxyMiddleware, WalmartUAMiddleware, _client_hints
+from walmart_scraper.spiders.walmart import USER_AGENTS
+
+CHROME_WIN = USER_AGENTS[0]
+SAFARI_MAC = USER_AGENTS[1]
+FIREFOX_WIN = USER_AGENTS[3]
+
+
+class _Spider:
+    logger = logging.getLogger('test')
+    USER_AGENTS = (CHROME_WIN, FIREFOX_WIN)
+
+
+def test_client_hints_from_chrome_ua():
+    hints = dict(_client_hints(CHROME_WIN))
+    assert hints == {
+        'Sec-CH-UA': '"Chromium";v="122", "Not(A:Brand";v="24", "Google Chrome";v="122"',
+        'Sec-CH-UA-Mobile': '?0',
+        'Sec-CH-UA-Platform': '"Windows"',
+    }
+    assert dict(_client_hints(USER_AGENTS[4]))['Sec-CH-UA-Platform'] == '"macOS"'
+
+
+def test_client_hints_none_for_non_chrome_ua():
+    assert _client_hints(SAFARI_MAC) is None
+    assert _client_hints(FIREFOX_WIN) is None
+
+
+def test_ua_middleware_cycles_agents_and_drops_stale_hints():
+    mw = WalmartUAMiddleware(Settings())
+    spider = _Spider()
+    chrome = Request('https://www.walmart.com/ip/1')
+    mw.process_request(chrome, spider)
+    assert chrome.headers['User-Agent'].decode() == CHROME_WIN
+    assert chrome.headers['Sec-CH-UA-Platform'] == b'"Windows"'
+
+    # next agent is Firefox: hint headers copied from an earlier request go
+    firefox = Request('https://www.walmart.com/ip/2', headers=dict(chrome.headers.to_unicode_dict()))
+    mw.process_request(firefox, spider)
+    assert firefox.headers['User-Agent'].decode() == FIREFOX_WIN
+    assert 'Sec-CH-UA' not in firefox.headers
+
+
+def test_rotating_proxy_splits_named_context_per_proxy(monkeypatch):
+    mw = RotatingProxyMiddleware(['http://user:pw@1.2.3.4:8000', '5.6.7.8:3128'])
+    spider = _Spider()
+    base_kwargs = {'user_agent': CHROME_WIN}
+    picks = iter([1, 0, 0])
+    monkeypatch.setattr(mw, '_pick_index', lambda: next(picks))
+
+    req = Request('https://www.walmart.com/search?q=x', meta={
+        'playwright': True,
+        'playwright_context': 'walmart-session',
+        'playwright_context_kwargs': base_kwargs,
+    })
+    mw.process_request(req, spider)
+    assert req.meta['playwright_context'] == 'walmart-session-1'
+    assert req.meta['playwright_context_kwargs'] == {
+        'user_agent': CHROME_WIN,
+        'proxy': {'server': 'http://5.6.7.8:3128'},
+    }
+    # the spider's shared kwargs are never mutated
+    assert base_kwargs == {'user_agent': CHROME_WIN}
+
+    # a retry carries the suffixed name; it is rebuilt from the base, not stacked
+    retry = req.replace()
+    mw.process_request(retry, spider)
+    assert retry.meta['playwright_context'] == 'walmart-session-0'
+    assert retry.meta['playwright_context_kwargs']['proxy'] == {
+        'server': 'http://1.2.3.4:8000', 'username': 'user', 'password': 'pw',
+    }
+
+    plain = Request('https://www.walmart.com/ip/1')
+    mw.process_request(plain, spider)
+    assert plain.meta['proxy'] == 'http://user:pw@1.2.3.4:8000'
+    assert 'playwright_context' not in plain.meta
@@ -1,5 +1,4 @@
 import os
-import glob
 import sys
 
 # make project importable for tests
@@ -13,6 +12,7 @@ import pytest
 from scrapy.http import HtmlResponse
 
 from walmart_scraper.spiders.walmart import WalmartSpider
+from helpers import latest_file
 
 HERE = os.path.dirname(__file__)
 ROOT = os.path.abspath(os.path.join(HERE, '..'))
@@ -20,11 +20,10 @@ WALMART_DIR = os.path.join(ROOT, 'walmart_scraper')
 
 
 def _load_latest_debug_html():
-    pattern = os.path.join(WALMART_DIR, 'debug_wallet_*.html')
-    files = sorted(glob.glob(pattern), key=os.path.getmtime, reverse=True)
-    if not files:
+    path = latest_file(WALMART_DIR, 'debug_wallet_*.html')
+    if not path:
         pytest.skip('no debug_wallet_*.html fixture present')
-    with open(files[0], 'r', encoding='utf-8') as f:
+    with open(path, 'r', encoding='utf-8') as f:
         return f.read()
 
 
@@ -40,7 +39,7 @@ def test_parse_blocked_page_returns_no_items():
 
 def test_start_requests_uses_storage_state_if_present(tmp_path, monkeypatch):
     # create a fake storage state file in the package dir and ensure spider
-    # attaches playwright_context to the Request.meta
+    # creates its shared playwright context with that storage state
     import importlib
     from pathlib import Path
 
@@ -55,13 +54,43 @@ def test_start_requests_uses_storage_state_if_present(tmp_path, monkeypatch):
     spider = WalmartSpider(search_term='wallet')
     req = next(spider.start_requests())
     assert req.meta.get('playwright') is True
-    assert 'playwright_context' in req.meta
-    assert req.meta['playwright_context'].get('storageState') == str(storage_file)
+    assert req.meta['playwright_context'] == WalmartSpider.PLAYWRIGHT_CONTEXT
+    assert req.meta['playwright_context_kwargs'].get('storage_state') == str(storage_file)
 
     # cleanup
     storage_file.unlink()
 
 
+def test_page_methods_bind_to_playwright_signatures():
+    # Playwright's Python Page methods take their options keyword-only; a
+    # positional options dict only fails with TypeError mid-crawl
+    import inspect
+    from playwright.async_api import Page
+
+    spider = WalmartSpider(search_term='wallet')
+    search = next(spider.start_requests())
+    retry = spider._detail_request('https://www.walmart.com/ip/1', {}, 1, 1, playwright=True)
+    for req in (search, retry):
+        for pm in req.meta['playwright_page_methods']:
+            method = pm.method if callable(pm.method) else getattr(Page, pm.method)
+            # first positional slot is the page (self / the callable's page arg)
+            inspect.signature(method).bind(None, *pm.args, **pm.kwargs)
+
+
+@pytest.mark.parametrize('text,expected', [
+    ('$12.34', 12.34),
+    ('$1,299.99', 1299.99),
+    ('Now $5', 5.0),
+    ('current price $7.5', 7.5),
+    ('$0.99/ea', 0.99),
+    ('no digits', None),
+    ('', None),
+])
+def test_parse_price_scanner(text, expected):
+    spider = WalmartSpider(search_term='wallet')
+    assert spider._parse_price(text) == expected
+
+
 def test_parse_simple_product_snippet():
     html = '''
     <html><body>
@@ -121,6 +150,122 @@ def test_detail_page_enrichment():
     assert enriched['image'] == 'https://example.com/detail.jpg'
 
 
+def test_detail_page_missing_price_retries_with_playwright():
+    # card had a name but no price; the static detail HTML has an <h1> but
+    # still no price, so the spider must fall back to a browser fetch
+    detail_html = '''
+    <html><body>
+      <h1 itemprop="name">Wallet Detail</h1>
+      <img class="prod-hero-image" src="https://example.com/detail.jpg" />
+    </body></html>
+    '''
+    from scrapy import Request
+    partial = {'name': 'Wallet', 'link': 'https://www.walmart.com/ip/1', 'image': 'https://example.com/card.jpg'}
+    spider = WalmartSpider(search_term='wallet')
+    request = Request(url='https://www.walmart.com/ip/1', meta={'partial_item': partial, 'card_index': 1})
+    detail_resp = HtmlResponse(url='https://www.walmart.com/ip/1', request=request, body=detail_html, encoding='utf-8')
+
+    results = list(spider.parse_product_detail(detail_resp))
+    assert len(results) == 1
+    retry = results[0]
+    assert retry.meta.get('playwright') is True
+    assert retry.dont_filter
+    assert retry.meta['partial_item'] is partial
+
+    # the browser response is final: still no price means the product is rejected
+    browser_request = Request(url='https://www.walmart.com/ip/1', meta={**retry.meta})
+    browser_resp = HtmlResponse(url='https://www.walmart.com/ip/1', request=browser_request, body=detail_html, encoding='utf-8')
+    assert list(spider.parse_product_detail(browser_resp)) == []
+
+
+def test_redirected_block_page_retries_original_url():
+    # the static fetch was redirected to the PerimeterX challenge; its <h1>
+    # must not become the product name and the retry targets the product URL
+    block_html = '''
+    <html><body>
+      <h1>Robot or human?</h1>
+      <div id="px-captcha"></div>
+    </body></html>
+    '''
+    from scrapy import Request
+    product_url = 'https://www.walmart.com/ip/1'
+    blocked_url = 'https://www.walmart.com/blocked?url=L2lwLzE='
+    partial = {'link': product_url, 'image': 'https://example.com/card.jpg'}
+    spider = WalmartSpider(search_term='wallet')
+    request = Request(url=blocked_url, meta={'partial_item': partial, 'card_index': 1, 'redirect_urls': [product_url]})
+    blocked_resp = HtmlResponse(url=blocked_url, request=request, body=block_html, encoding='utf-8')
+
+    results = list(spider.parse_product_detail(blocked_resp))
+    assert len(results) == 1
+    retry = results[0]
+    assert retry.url == product_url
+    assert retry.meta.get('playwright') is True
+
+    # blocked again in the browser: dropped, never yielded as an item
+    browser_request = Request(url=blocked_url, meta={**retry.meta, 'redirect_urls': [product_url]})
+    browser_resp = HtmlResponse(url=blocked_url, request=browser_request, body=block_html, encoding='utf-8')
+    assert list(spider.parse_product_detail(browser_resp)) == []
+
+
+# card fragments the card attempt tables look for, in and around each card
+_CARD_FRAGMENTS = (
+    '<span data-automation-id="product-title">Title {i}</span>',
+    '<a href="/ip/{i}"><span class="w_iUH7">Alt title {i}</span></a>',
+    '<span class="w_iUH7">Loose span {i}</span>',
+    '<div class="f6 f5-l">Small title {i}</div>',
+    '<div data-automation-id="product-price"><div>${i}.99</div></div>',
+    '<span class="aa88">${i}.49</span>',
+    '<span class="price-characteristic" content="{i}.25"></span>',
+    '<img data-testid="productTileImage" src="https://example.com/{i}.jpg" />',
+    '<img src="  " data-src="https://example.com/lazy{i}.jpg" />',
+    '<img srcset="https://example.com/s{i}.jpg 1x, https://example.com/s{i}b.jpg 2x" />',
+    '<span data-automation-id="fulfillment-badge">Free shipping {i}</span>',
+    '<span>Pickup today {i}</span>',
+    '<span>   </span>',
+)
+
+
+def _random_search_page(rng, legacy=False):
+    card_open = '<div class="search-result-gridview-item-wrapper">' if legacy else '<div data-item-id="{i}">'
+    parts = []
+    for i in range(rng.randint(1, 12)):
+        body = ''.join(rng.sample(_CARD_FRAGMENTS, rng.randint(0, 6))).format(i=i)
+        card = card_open.format(i=i) + body + '</div>'
+        # a card wrapped in a link: combinator attempts ("a span") must not
+        # match through an <a> that sits outside the card
+        if rng.random() < 0.3:
+            card = f'<a href="/outer/{i}">{card}</a>'
+        parts.append(card)
+        if rng.random() < 0.3:
+            parts.append(rng.choice(_CARD_FRAGMENTS).format(i=100 + i))
+    return '<html><body>' + ''.join(parts) + '</body></html>'
+
+
+@pytest.mark.parametrize('legacy', [False, True])
+def test_batch_extract_matches_per_card_extract(legacy):
+    import random
+    from walmart_scraper.spiders.walmart import _CARD_LAYOUTS, _node_root
+
+    rng = random.Random(1234 + legacy)
+    spider = WalmartSpider(search_term='wallet')
+    card_src, cards_xpath = _CARD_LAYOUTS[1 if legacy else 0]
+    tables = {
+        'name': WalmartSpider.CARD_NAME_ATTEMPTS,
+        'price': WalmartSpider.CARD_PRICE_ATTEMPTS,
+        'image': WalmartSpider.CARD_IMAGE_ATTEMPTS,
+        'link': WalmartSpider.CARD_LINK_ATTEMPTS,
+        'shipping': WalmartSpider.CARD_SHIPPING_ATTEMPTS,
+    }
+    for _ in range(40):
+        html = _random_search_page(rng, legacy=legacy)
+        response = HtmlResponse(url='https://www.walmart.com/search?q=wallet', body=html, encoding='utf-8')
+        root = _node_root(response)
+        cards = cards_xpath(root)
+        for field, attempts in tables.items():
+            expected = [spider._attempt_extract(card, field, attempts) for card in cards]
+            assert spider._batch_extract(root, cards, field, attempts, card_src) == expected, (field, html)
+
+
 def test_parse_two_wallet_products_respects_limit():
     html = '''
     <html><body>
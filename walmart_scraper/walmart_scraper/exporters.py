@@ -0,0 +1,55 @@
+# Feed exporters backed by orjson
+#
+# See documentation in:
+# https://docs.scrapy.org/en/latest/topics/feed-exports.html
+
+from scrapy.exporters import JsonItemExporter, JsonLinesItemExporter
+
+try:
+    import orjson
+except ImportError:  # optional dependency
+    orjson = None
+
+
+def _use_orjson(exporter):
+    # orjson always emits compact UTF-8; defer to Scrapy's encoder otherwise
+    return orjson is not None and exporter.encoding in (None, "utf-8") and not exporter.indent
+
+
+class OrjsonLinesItemExporter(JsonLinesItemExporter):
+    """JSON Lines exporter that encodes items with `orjson.dumps`.
+
+    Falls back to Scrapy's encoder when orjson is missing or the feed asks
+    for an indent or a non-UTF-8 encoding. Values orjson has no native
+    encoding for (Decimal, set, nested items) are handed to the
+    Scrapy encoder's `default`, so they serialize exactly as upstream.
+    """
+
+    def __init__(self, file, **kwargs):
+        super().__init__(file, **kwargs)
+        self._orjson = _use_orjson(self)
+
+    def export_item(self, item):
+        if not self._orjson:
+            return super().export_item(item)
+        data = orjson.dumps(
+            dict(self.get_serialized_fields(item)),
+            default=self.encoder.default,
+            option=orjson.OPT_APPEND_NEWLINE,
+        )
+        self.file.write(data)
+
+
+class OrjsonItemExporter(JsonItemExporter):
+    """JSON array exporter that encodes items with `orjson.dumps`."""
+
+    def __init__(self, file, **kwargs):
+        super().__init__(file, **kwargs)
+        self._orjson = _use_orjson(self)
+
+    def export_item(self, item):
+        if not self._orjson:
+            return super().export_item(item)
+        data = orjson.dumps(dict(self.get_serialized_fields(item)), default=self.encoder.default)
+        self._add_comma_after_first()
+        self.file.write(data)
@@ -3,6 +3,8 @@
 # See documentation in:
 # https://docs.scrapy.org/en/latest/topics/items.html
 
+from dataclasses import dataclass, field, fields
+
 import scrapy
 
 
@@ -10,3 +12,40 @@ class WalmartScraperItem(scrapy.Item):
     # define the fields for your item here like:
     # name = scrapy.Field()
     pass
+
+
+@dataclass(slots=True)
+class ProductItem:
+    """Fixed-shape product record yielded by the walmart spider.
+
+    Slots keep per-item memory well below a plain dict. Scrapy exporters and
+    pipelines handle it through ItemAdapter (which, unlike a NamedTuple, it
+    supports natively); `get`/`[]` are kept so code that treats products as
+    mappings keeps working. `missing_fields` defaults to a shared empty tuple
+    so complete items allocate no list for it.
+    """
+
+    name: str | None = None
+    price: float | None = None
+    image: str | None = None
+    images: list = field(default_factory=list)
+    shipping: str | None = None
+    description: str | None = None
+    link: str | None = None
+    source: str | None = None
+    incomplete: bool = False
+    missing_fields: list | tuple = ()
+    detail_url: str | None = None
+
+    def __getitem__(self, key):
+        if key not in _PRODUCT_FIELDS:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def get(self, key, default=None):
+        if key not in _PRODUCT_FIELDS:
+            return default
+        return getattr(self, key)
+
+
+_PRODUCT_FIELDS = frozenset(f.name for f in fields(ProductItem))
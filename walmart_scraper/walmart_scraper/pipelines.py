@@ -4,11 +4,16 @@
 # See: https://docs.scrapy.org/en/latest/topics/item-pipeline.html
 
 
+import logging
+
 # useful for handling different item types with a single interface
 from itemadapter import ItemAdapter
 
 
 class WalmartScraperPipeline:
     def process_item(self, item, spider):
-        spider.logger.info('Pipeline received item link=%s incomplete=%s name=%s price=%s', item.get('link'), item.get('incomplete'), item.get('name'), item.get('price'))
+        logger = spider.logger
+        if logger.isEnabledFor(logging.INFO):
+            adapter = ItemAdapter(item)
+            logger.info('Pipeline received item link=%s incomplete=%s name=%s price=%s', adapter.get('link'), adapter.get('incomplete'), adapter.get('name'), adapter.get('price'))
         return item
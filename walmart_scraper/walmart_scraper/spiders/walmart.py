@@ -1,20 +1,356 @@
+import functools
+import hashlib
 import json
-import random
-import re
+import logging
+import os
+import time
 from datetime import datetime
+from itertools import chain, cycle, islice
 from pathlib import Path
-from urllib.parse import parse_qs, urlencode, urlparse, urlunparse
+from urllib.parse import parse_qs, urlencode, urljoin, urlparse, urlunparse
 
 import scrapy
+from lxml import etree
+from parsel.csstranslator import HTMLTranslator
+from playwright.async_api import TimeoutError as PlaywrightTimeoutError
+from scrapy.utils.defer import maybe_deferred_to_future
 from scrapy_playwright.page import PageMethod
+from twisted.internet import threads
 
-USER_AGENTS = [
+from walmart_scraper.items import ProductItem
+
+try:
+    import orjson
+except ImportError:  # optional speedup; stdlib json is the fallback
+    orjson = None
+
+try:
+    import ijson
+except ImportError:  # optional; __NEXT_DATA__ falls back to a full parse
+    ijson = None
+
+try:
+    import xxhash
+except ImportError:  # optional; seen-link keys fall back to an 8-byte blake2b
+    xxhash = None
+
+_json_loads = orjson.loads if orjson else json.loads
+_BASE_URL = "https://www.walmart.com"
+# fields a product needs before it is yielded as complete
+_REQUIRED_FIELDS = ("name", "price", "image", "link")
+# Playwright storage state saved by the app's captcha flow; path resolved at import
+_STORAGE_FILE = Path(__file__).resolve().parents[1] / "walmart_storage.json"
+
+# quoted, single-quoted and bare forms of the script tag's id attribute
+_NEXT_DATA_MARKERS = (b'id="__NEXT_DATA__"', b"id='__NEXT_DATA__'", b"id=__NEXT_DATA__")
+_NEXT_DATA_ITEMS_PREFIX = "props.pageProps.initialData.searchResult.itemStacks.item.items.item"
+# bot-challenge interstitial text (same signals as the app's detect_captcha,
+# minus the generic words that also appear in ordinary product pages)
+_BLOCK_MARKERS = (b"robot or human", b"are you a robot", b"px-captcha")
+
+USER_AGENTS = (
     "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/122.0.0.0 Safari/537.36",
     "Mozilla/5.0 (Macintosh; Intel Mac OS X 13_6_1) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/16.4 Safari/605.1.15",
     "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/117.0.0.0 Safari/537.36",
     "Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:115.0) Gecko/20100101 Firefox/115.0",
     "Mozilla/5.0 (Macintosh; Intel Mac OS X 13_4) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/114.0.0.0 Safari/537.36",
-]
+)
+# request headers per agent, built once; Scrapy copies them into each
+# request's Headers, so the shared dicts are never mutated
+_HEADER_SETS = tuple({"User-Agent": ua, "Accept-Language": "en-US,en;q=0.9"} for ua in USER_AGENTS)
+# rotated in order (no RNG state touched); the start is offset by pid so
+# separate crawl processes do not all open with the same agent
+_HEADER_CYCLE = islice(cycle(_HEADER_SETS), os.getpid() % len(_HEADER_SETS), None)
+
+_CSS_TRANSLATOR = HTMLTranslator()
+
+# fulfillment keywords matched case-insensitively against span text
+_FULFILLMENT_KEYWORDS = ("shipping", "pickup", "delivery")
+
+
+def _keyword_text_xpath(keywords):
+    # lowercase with translate() and OR the contains() checks so every keyword
+    # is matched inside libxml2 by one compiled expression; cssselect's
+    # :contains() is case-sensitive
+    letters = "".join(sorted({c for kw in keywords for c in kw if c.isalpha()}))
+    lowered = f"translate(., '{letters.upper()}', '{letters}')"
+    checks = " or ".join(f"contains({lowered}, '{kw}')" for kw in keywords)
+    return f".//span[{checks}]/text()"
+
+
+_SHIPPING_TEXT_XPATH = _keyword_text_xpath(_FULFILLMENT_KEYWORDS)
+
+_LOG_LEVELS = {
+    "debug": logging.DEBUG,
+    "info": logging.INFO,
+    "warning": logging.WARNING,
+    "error": logging.ERROR,
+}
+
+
+class _LogContext:
+    """`key=value` context for `WalmartSpider._log`, rendered only when emitted."""
+
+    __slots__ = ("base", "ctx")
+    BASE_KEYS = ("run_id", "search_term", "found", "target", "pages_processed")
+
+    def __init__(self, base, ctx):
+        self.base = base
+        self.ctx = ctx
+
+    def __str__(self):
+        ctx = self.ctx
+        parts = [f"{k}={v!r}" for k, v in zip(self.BASE_KEYS, self.base) if k not in ctx]
+        parts.extend(f"{k}={v!r}" for k, v in ctx.items())
+        return " ".join(parts)
+
+
+@functools.lru_cache(maxsize=256)
+def _xpath(src):
+    """Compiled lxml XPath for `src`, built once per distinct expression."""
+    return etree.XPath(src, smart_strings=False)
+
+
+@functools.lru_cache(maxsize=256)
+def _anchored_xpath(card_src, src):
+    """Page-wide XPath for attempt `src`, evaluated under every card `card_src` matches.
+
+    Each hit is exactly one the per-card evaluation would return for some
+    card, so a combinator's left part (the `a` of `a span`) must sit inside
+    the card, as it must when the card is the context node. String results
+    keep their lxml parent (smart strings) so hits can be mapped back to
+    their card. cssselect joins selector groups with " | ", and each branch
+    is anchored on its own.
+    """
+    return etree.XPath(" | ".join(f"({card_src})/{part}" for part in src.split(" | ")))
+
+
+@functools.lru_cache(maxsize=256)
+def _css_xpath(css):
+    """Compiled lxml XPath for a parsel-style CSS selector (::text/::attr supported)."""
+    return _xpath(_CSS_TRANSLATOR.css_to_xpath(css))
+
+
+def _link_key(link):
+    # canonical product URL: tracking/variant query strings and fragments
+    # do not make a different product
+    data = link.split("?", 1)[0].split("#", 1)[0].encode()
+    if xxhash is not None:
+        return xxhash.xxh64_intdigest(data)
+    return int.from_bytes(hashlib.blake2b(data, digest_size=8).digest(), "little")
+
+
+class _LinkSet:
+    """Set of seen product links stored as 64-bit integer digests.
+
+    Keeps one small int per link instead of the full URL string; a collision
+    only drops a product as a duplicate, which is acceptable at 2**-64.
+    Links are keyed without their query string or fragment.
+    """
+
+    __slots__ = ("_keys",)
+
+    def __init__(self):
+        self._keys = set()
+
+    def __contains__(self, link):
+        return bool(link) and _link_key(link) in self._keys
+
+    def add(self, link):
+        if link:
+            self._keys.add(_link_key(link))
+
+    def __len__(self):
+        return len(self._keys)
+
+
+class _AttemptTable(tuple):
+    """Compiled attempts plus `any_xpath`, a union of every attempt's XPath.
+
+    `any_xpath` answers "does any attempt match at all?" in a single subtree
+    walk; ordered per-attempt evaluation only runs when it has hits, so the
+    attempt priority (and the reported attempt index) is unchanged.
+    """
+
+    any_xpath = None
+
+
+def _compile_attempts(attempts):
+    """Translate each attempt's CSS selector to a compiled lxml XPath once.
+
+    Returns an `_AttemptTable` of attempt dicts with an added "xpath"
+    callable (or "error" when the selector cannot be translated) so
+    `_attempt_extract` never re-parses selector strings inside the per-card
+    loop. Attempts may give a raw "xpath" string instead of a CSS "selector".
+    """
+    compiled = []
+    sources = []
+    for attempt in attempts:
+        attempt = dict(attempt)
+        raw_xpath = attempt.pop("xpath", None)
+        try:
+            if raw_xpath:
+                # native XPath attempts are compiled as-is
+                attempt.setdefault("selector", raw_xpath)
+                src = raw_xpath
+            else:
+                css = attempt["selector"]
+                if attempt.get("extract") in ("attr", "all_attr") and attempt.get("attr"):
+                    css = f"{css}::attr({attempt['attr']})"
+                src = _CSS_TRANSLATOR.css_to_xpath(css)
+            attempt["xpath"] = _xpath(src)
+            # kept for page-wide batch runs, which anchor it under the cards
+            attempt["src"] = src
+            sources.append(src)
+        except Exception as e:
+            attempt["xpath"] = None
+            attempt["error"] = str(e)
+        compiled.append(attempt)
+    table = _AttemptTable(compiled)
+    if len(sources) > 1 and len(sources) == len(compiled):
+        table.any_xpath = _xpath(" | ".join(sources))
+    return table
+
+
+_CARD_SELECTOR = "div[data-item-id]"
+# older grid layout without item ids; same fallback order as app.py
+_LEGACY_CARD_SELECTOR = "div.search-result-gridview-item-wrapper"
+# card layouts in fallback order: (XPath source, compiled XPath)
+_CARD_LAYOUTS = tuple(
+    (src, _xpath(src)) for src in map(_CSS_TRANSLATOR.css_to_xpath, (_CARD_SELECTOR, _LEGACY_CARD_SELECTOR))
+)
+# first tile of either layout, or the JSON blob the JSON path reads
+_FIRST_TILE_SELECTOR = f'{_CARD_SELECTOR}, {_LEGACY_CARD_SELECTOR}, script[id="__NEXT_DATA__"]'
+
+_NEXT_DATA_XPATH = _css_xpath("script#__NEXT_DATA__::text")
+_NEXT_PAGE_HREF_XPATH = _css_xpath('a[aria-label="Next Page"]::attr(href)')
+_LD_JSON_XPATH = _xpath('//script[@type="application/ld+json"]/text()')
+
+# search-page scroll driver: scroll a viewport at a time until enough cards
+# have rendered (or the page bottom is reached), polled on animation frames
+_START_SCROLL_JS = "() => { window._scrollId = setInterval(() => window.scrollBy(0, window.innerHeight), 300); }"
+_CARDS_RENDERED_JS = (
+    # legacy wrappers only count when the page has no item-id cards, the
+    # same fallback the DOM parser uses
+    f"n => (document.querySelectorAll('{_CARD_SELECTOR}').length"
+    f" || document.querySelectorAll('{_LEGACY_CARD_SELECTOR}').length) >= n"
+    " || window.innerHeight + window.scrollY >= document.body.scrollHeight"
+)
+_STOP_SCROLL_JS = "() => clearInterval(window._scrollId)"
+
+
+async def _wait_for_cards(page, target, timeout=15000):
+    # scrapy-playwright re-raises page-method errors, which would discard the
+    # whole search response; a slow render or endless scroll growth should
+    # still parse whatever has rendered by the deadline
+    try:
+        await page.wait_for_function(_CARDS_RENDERED_JS, arg=target, polling="raf", timeout=timeout)
+    except PlaywrightTimeoutError:
+        return False
+    return True
+
+
+def _first_srcset_url(srcset):
+    """First candidate URL of a srcset ("a.jpg 1x, b.jpg 2x" -> "a.jpg"), or None."""
+    seg = srcset.lstrip()
+    cut = seg.find(",")
+    if cut != -1:
+        seg = seg[:cut]
+    cut = seg.find(" ")
+    if cut != -1:
+        seg = seg[:cut]
+    if not seg.isprintable():
+        # tab/newline/nbsp descriptor separators are rare; split on any whitespace
+        seg = seg.split(None, 1)[0]
+    return seg or None
+
+
+_GALLERY_SELECTORS = (
+    "img.prod-hero-image",
+    "img[itemprop='image']",
+    "ul.slider-list img",
+    "div.carousel img",
+    "div.thumbnail-list img",
+    "div.product-image-gallery img",
+)
+_GALLERY_IMG_XPATH = _xpath(" | ".join(_CSS_TRANSLATOR.css_to_xpath(sel) for sel in _GALLERY_SELECTORS))
+_GALLERY_SELECTOR_XPATHS = tuple(_css_xpath(sel) for sel in _GALLERY_SELECTORS)
+_GALLERY_ANCESTOR_PRIORITY = (
+    ("ul", "slider-list", 2),
+    ("div", "carousel", 3),
+    ("div", "thumbnail-list", 4),
+    ("div", "product-image-gallery", 5),
+)
+
+
+def _gallery_priority(img):
+    """Index of the first `_GALLERY_SELECTORS` entry that matches `img`."""
+    if "prod-hero-image" in (img.get("class") or "").split():
+        return 0
+    if img.get("itemprop") == "image":
+        return 1
+    best = len(_GALLERY_SELECTORS) - 1
+    for anc in img.iterancestors():
+        classes = (anc.get("class") or "").split()
+        for tag, cls, priority in _GALLERY_ANCESTOR_PRIORITY:
+            if priority < best and anc.tag == tag and cls in classes:
+                best = priority
+        if best == 2:
+            break
+    return best
+
+
+def _dig(d, *keys):
+    # nested dict lookup that stops at the first missing step instead of
+    # allocating an empty default per level
+    for key in keys:
+        if not isinstance(d, dict):
+            return None
+        d = d.get(key)
+        if d is None:
+            return None
+    return d
+
+
+def _is_blocked(response):
+    """True for a bot challenge: a redirect to /blocked or the captcha interstitial."""
+    if urlparse(response.url).path.startswith("/blocked"):
+        return True
+    body = response.body.lower()
+    return any(m in body for m in _BLOCK_MARKERS)
+
+
+def _node_root(node):
+    """Underlying lxml element for a Scrapy response, a parsel Selector or a bare lxml element."""
+    node = getattr(node, "selector", node)
+    return getattr(node, "root", node)
+
+
+def _owning_card(hit, card_pos):
+    """Position of the nearest card at or above an XPath hit, or None.
+
+    `hit` is an element or a smart string (text or attribute value); a tail
+    text node belongs to its element's parent, not to the element.
+    """
+    if isinstance(hit, str):
+        node = hit.getparent()
+        if node is not None and hit.is_tail:
+            node = node.getparent()
+    else:
+        node = hit
+    while node is not None:
+        pos = card_pos.get(node)
+        if pos is not None:
+            return pos
+        node = node.getparent()
+    return None
+
+
+def _xpath_result_text(result):
+    # mirror parsel's Selector.get(): text/attr hits are strings, elements serialize as html
+    if isinstance(result, str):
+        return result
+    return etree.tostring(result, method="html", encoding="unicode", with_tail=False)
 
 
 class WalmartSpider(scrapy.Spider):
@@ -25,6 +361,66 @@ class WalmartSpider(scrapy.Spider):
         "LOG_LEVEL": "DEBUG",
     }
 
+    # one named Playwright context shared by search and detail pages; it is
+    # created (storage state, user agent, viewport) on the first request and
+    # reused, so pages are closed but the context never is
+    PLAYWRIGHT_CONTEXT = "walmart-session"
+    # download slot for detail-page enrichment; concurrency is set by
+    # DOWNLOAD_SLOTS in settings.py
+    DETAIL_SLOT = "walmart-detail"
+    # cap on "no cards" HTML dumps per run
+    MAX_DEBUG_DUMPS = 3
+
+    CARD_NAME_ATTEMPTS = _compile_attempts([
+        {"selector": 'span[data-automation-id="product-title"]::text', "extract": "text"},
+        {"selector": "a span.w_iUH7::text", "extract": "text"},
+        {"selector": ".f6.f5-l::text", "extract": "text"},
+    ])
+    CARD_PRICE_ATTEMPTS = _compile_attempts([
+        {"selector": 'div[data-automation-id="product-price"] div::text', "extract": "text"},
+        {"selector": ".aa88::text", "extract": "text"},
+        {"selector": "span.price-characteristic::attr(content)", "extract": "text"},
+    ])
+    CARD_IMAGE_ATTEMPTS = _compile_attempts([
+        {"selector": 'img[data-testid="productTileImage"]', "extract": "attr", "attr": "src"},
+        {"selector": "img", "extract": "attr", "attr": "src"},
+        # lazy-loaded tiles: the attribute is read once and only its first URL kept
+        {"selector": "img", "extract": "attr", "attr": "data-src"},
+        {"selector": "img", "extract": "attr", "attr": "srcset", "first_url": True},
+    ])
+    CARD_LINK_ATTEMPTS = _compile_attempts([
+        {"selector": "a", "extract": "attr", "attr": "href"},
+    ])
+    CARD_SHIPPING_ATTEMPTS = _compile_attempts([
+        {"selector": 'span[data-automation-id="fulfillment-badge"]', "extract": "text"},
+        {"selector": 'div[data-testid="shippingMessage"]', "extract": "text"},
+        {"xpath": _SHIPPING_TEXT_XPATH, "extract": "text"},
+    ])
+
+    # detail attempts are ordered by hit rate: the schema.org itemprop markup
+    # is on every server-rendered product page, the prod-*/price-* classes
+    # only on the legacy layout
+    DETAIL_NAME_ATTEMPTS = _compile_attempts([
+        {"selector": 'h1[itemprop="name"]::text', "extract": "text"},
+        {"selector": "h1.prod-ProductTitle::text", "extract": "text"},
+        {"selector": "h1::text", "extract": "text"},
+    ])
+    DETAIL_PRICE_ATTEMPTS = _compile_attempts([
+        {"selector": 'meta[itemprop="price"]', "extract": "attr", "attr": "content"},
+        {"selector": "span.price-characteristic", "extract": "attr", "attr": "content"},
+        {"selector": "span.price::text", "extract": "text"},
+    ])
+    DETAIL_DESCRIPTION_ATTEMPTS = _compile_attempts([
+        {"selector": "#product-description p::text", "extract": "text"},
+        {"selector": '[data-testid="product-description"]::text', "extract": "text"},
+        {"selector": 'meta[name="description"]', "extract": "attr", "attr": "content"},
+    ])
+    DETAIL_SHIPPING_ATTEMPTS = _compile_attempts([
+        {"selector": '[data-testid="fulfillment-summary"]::text', "extract": "text"},
+        {"xpath": _SHIPPING_TEXT_XPATH, "extract": "text"},
+        {"selector": 'div[data-automation-id="fulfillment-badge"]::text', "extract": "text"},
+    ])
+
     def __init__(
         self,
         search_term="laptop",
@@ -33,6 +429,8 @@ class WalmartSpider(scrapy.Spider):
         num_products=10,
         scrape_run_id=None,
         max_pages=8,
+        collect_gallery=True,
+        bootstrap_storage=False,
         *args,
         **kwargs,
     ):
@@ -42,66 +440,151 @@ class WalmartSpider(scrapy.Spider):
         self.max_price = float(max_price) if max_price else float("inf")
         self.num_products = int(num_products)
         self.max_pages = max(1, int(max_pages))
+        # full detail-page gallery for image consumers; off = first image only
+        self.collect_gallery = str(collect_gallery).lower() not in ("0", "false", "no")
+        # opt-in: with no saved storage state, open a headed browser once so a
+        # human can clear the captcha before the crawl starts (local runs only)
+        self.bootstrap_storage = str(bootstrap_storage).lower() in ("1", "true", "yes")
         self.scrape_run_id = scrape_run_id or f"run-{int(datetime.utcnow().timestamp())}"
         self.results_found = 0
-        self.seen_links = set()
+        self.seen_links = _LinkSet()
+        # links already sent for detail enrichment (accepted or not)
+        self.detail_links = _LinkSet()
         self.pages_processed = 0
         self.card_attempts = 0
+        self.debug_dumps = 0
+        # checked once per crawl (the app may write the file between runs);
+        # every request reuses the same answer
+        self._storage_state = str(_STORAGE_FILE) if _STORAGE_FILE.exists() else None
+        self._headers = next(_HEADER_CYCLE)
+        self._context_ua = self._headers["User-Agent"]
+        # context options only apply when the named context is first created,
+        # so the meta is built once and shared (middlewares replace, never
+        # mutate, the kwargs dict)
+        self._context_meta = self._shared_context_meta()
 
     def _log(self, level, message, **ctx):
-        base = {
-            "run_id": self.scrape_run_id,
-            "search_term": self.search_term,
-            "found": self.results_found,
-            "target": self.num_products,
-            "pages_processed": self.pages_processed,
-        }
-        base.update(ctx)
-        context = " ".join(f"{k}={base[k]!r}" for k in sorted(base.keys()))
-        getattr(self.logger, level)(f"{message} | {context}")
-
-    def _first_text(self, el, *selectors):
-        for s in selectors:
-            v = el.css(s).get()
-            if v:
-                return v.strip()
-        return None
+        levelno = _LOG_LEVELS[level]
+        if not self.logger.isEnabledFor(levelno):
+            return
+        base = (
+            self.scrape_run_id,
+            self.search_term,
+            self.results_found,
+            self.num_products,
+            self.pages_processed,
+        )
+        self.logger.log(levelno, "%s | %s", message, _LogContext(base, ctx))
 
     def _parse_price(self, txt):
         if not txt:
             return None
-        m = re.search(r"[\d,]+(?:\.\d+)?", txt)
-        if not m:
+        cents = self._parse_price_cents(txt)
+        return cents / 100 if cents is not None else None
+
+    def _parse_price_cents(self, txt):
+        """Parse a price string into integer cents ("$1,299.99" -> 129999).
+
+        Single left-to-right scan: skip to the first digit, accumulate the
+        whole part ignoring thousands separators, then read up to two
+        decimals. Cheaper than a regex for these short fixed-shape strings.
+        """
+        i, n = 0, len(txt)
+        while i < n and not ("0" <= txt[i] <= "9"):
+            i += 1
+        if i == n:
             return None
+        whole = 0
+        while i < n:
+            ch = txt[i]
+            if "0" <= ch <= "9":
+                whole = whole * 10 + (ord(ch) - 48)
+            elif ch != ",":
+                break
+            i += 1
+        cents = 0
+        if i + 1 < n and txt[i] == "." and "0" <= txt[i + 1] <= "9":
+            cents = (ord(txt[i + 1]) - 48) * 10
+            if i + 2 < n and "0" <= txt[i + 2] <= "9":
+                cents += ord(txt[i + 2]) - 48
+        return whole * 100 + cents
+
+    def _find_next_data(self, response):
+        """Return the __NEXT_DATA__ script body, or None.
+
+        The tag is located with a byte scan of the raw body so the JSON path
+        never walks the parsed tree; XPath is only used when the scan misses
+        (unexpected attribute layout or an unterminated tag).
+        """
+        body = response.body
+        for marker in _NEXT_DATA_MARKERS:
+            start = body.find(marker)
+            if start == -1:
+                continue
+            start = body.find(b">", start) + 1
+            end = body.find(b"</script>", start)
+            if start and end != -1:
+                return body[start:end] or None
+            break
+        hits = _NEXT_DATA_XPATH(_node_root(response))
+        return hits[0] if hits else None
+
+    def _iter_next_data_items(self, next_data):
+        """Yield search result items from the __NEXT_DATA__ blob.
+
+        With ijson the items are streamed straight out of the blob without
+        building the rest of the document tree; otherwise the blob is parsed
+        in full and the item stacks chained lazily.
+        """
+        if ijson is not None:
+            blob = next_data.encode("utf-8") if isinstance(next_data, str) else next_data
+            return ijson.items(blob, _NEXT_DATA_ITEMS_PREFIX, use_float=True)
+        data = _json_loads(next_data)
         try:
-            return float(m.group(0).replace(",", ""))
-        except Exception:
-            return None
+            item_stacks = data["props"]["pageProps"]["initialData"]["searchResult"]["itemStacks"] or ()
+        except (KeyError, TypeError):
+            item_stacks = ()
+        # lazy: parse stops pulling items once it has enough products
+        return chain.from_iterable(_dig(stack, "items") or () for stack in item_stacks)
 
     def _attempt_extract(self, node, field_name, attempts, card_idx=None):
         """Try selectors in order and emit attempt-level logs.
 
-        attempts format: [{"selector": "...", "extract": "text|attr|all_attr", "attr": "src"}]
+        attempts come from `_compile_attempts`: [{"selector": "...", "extract": "text|attr|all_attr",
+        "attr": "src", "xpath": <lxml.etree.XPath>}]; attr attempts flagged "first_url"
+        keep only the first URL of a srcset-style value.
         """
+        root = _node_root(node)
+        any_xpath = getattr(attempts, "any_xpath", None)
+        if any_xpath is not None and not any_xpath(root):
+            self._log("debug", "field extraction skipped; no selector matched", field=field_name, card_index=card_idx, attempts=len(attempts))
+            return None, None
         for attempt_idx, attempt in enumerate(attempts, start=1):
             selector = attempt["selector"]
             extract_mode = attempt.get("extract", "text")
             attr = attempt.get("attr")
             value = None
-            err = None
+            err = attempt.get("error")
             try:
+                xpath = attempt["xpath"]
+                if xpath is None:
+                    raise ValueError(err or "selector could not be compiled")
                 if extract_mode == "text":
-                    value = node.css(selector).get()
+                    hits = xpath(root)
+                    value = _xpath_result_text(hits[0]) if hits else None
                     value = value.strip() if isinstance(value, str) else value
                 elif extract_mode == "attr":
                     if not attr:
                         raise ValueError("attr extraction requires attr key")
-                    value = node.css(f"{selector}::attr({attr})").get()
+                    hits = xpath(root)
+                    value = _xpath_result_text(hits[0]) if hits else None
                     value = value.strip() if isinstance(value, str) else value
+                    if value and attempt.get("first_url"):
+                        value = _first_srcset_url(value)
                 elif extract_mode == "all_attr":
                     if not attr:
                         raise ValueError("all_attr extraction requires attr key")
-                    value = [v.strip() for v in node.css(f"{selector}::attr({attr})").getall() if v and v.strip()]
+                    value = [v.strip() for v in map(_xpath_result_text, xpath(root)) if v and v.strip()]
                 else:
                     raise ValueError(f"unsupported extract mode: {extract_mode}")
             except Exception as e:
@@ -123,13 +606,62 @@ class WalmartSpider(scrapy.Spider):
                 return value, attempt_idx
         return None, None
 
-    def _extract_shipping(self, node, card_idx=None):
-        shipping_attempts = [
-            {"selector": 'span[data-automation-id="fulfillment-badge"]', "extract": "text"},
-            {"selector": 'div[data-testid="shippingMessage"]', "extract": "text"},
-            {"selector": 'span:contains("shipping")', "extract": "text"},
-        ]
-        shipping, attempt_idx = self._attempt_extract(node, "shipping", shipping_attempts, card_idx=card_idx)
+    def _batch_extract(self, root, cards, field_name, attempts, card_src):
+        """`_attempt_extract` results for every card from page-wide XPath runs.
+
+        Each attempt is evaluated once, anchored under every card matched by
+        `card_src` (see `_anchored_xpath`), and its hits are mapped back to
+        their card, so selector calls no longer scale with the card count.
+        Attempt priority and the first-hit-per-card rule match
+        `_attempt_extract`; cards already filled are not revisited.
+
+        One difference remains: a hit inside nested cards is credited only
+        to the innermost card, where per-card evaluation of the outer card
+        would also see it.
+        """
+        card_pos = {card: pos for pos, card in enumerate(cards)}
+        results = [(None, None)] * len(cards)
+        remaining = len(cards)
+        for attempt_idx, attempt in enumerate(attempts, start=1):
+            if not remaining:
+                break
+            src = attempt.get("src")
+            xpath = _anchored_xpath(card_src, src) if src else None
+            extract_mode = attempt.get("extract", "text")
+            if xpath is None or extract_mode not in ("text", "attr"):
+                self._log("debug", "batch field extraction attempt skipped", field=field_name, attempt=attempt_idx, selector=attempt["selector"], extract=extract_mode, error=attempt.get("error"))
+                continue
+            seen = set()
+            filled = 0
+            for hit in xpath(root):
+                pos = _owning_card(hit, card_pos)
+                if pos is None or pos in seen or results[pos][0]:
+                    continue
+                seen.add(pos)
+                value = _xpath_result_text(hit).strip()
+                if value and attempt.get("first_url"):
+                    value = _first_srcset_url(value)
+                if value:
+                    results[pos] = (value, attempt_idx)
+                    filled += 1
+            remaining -= filled
+            self._log(
+                "debug",
+                "batch field extraction attempt",
+                field=field_name,
+                attempt=attempt_idx,
+                selector=attempt["selector"],
+                extract=extract_mode,
+                filled=filled,
+                remaining=remaining,
+            )
+        return results
+
+    def _extract_shipping(self, node, card_idx=None, result=None):
+        # `result` is a precomputed (value, attempt) pair from `_batch_extract`
+        if result is None:
+            result = self._attempt_extract(node, "shipping", self.CARD_SHIPPING_ATTEMPTS, card_idx=card_idx)
+        shipping, attempt_idx = result
         if shipping:
             self._log("info", "shipping extracted", card_index=card_idx, attempt=attempt_idx, value=shipping[:140])
         else:
@@ -141,7 +673,11 @@ class WalmartSpider(scrapy.Spider):
             return None
         if link.startswith("http"):
             return link
-        return f"https://www.walmart.com{link}"
+        if link.startswith("/") and not link.startswith("//"):
+            # root-relative, the usual shape: a plain concat, no URL parsing
+            return _BASE_URL + link
+        # protocol-relative or path-relative hrefs are rare; resolve properly
+        return urljoin(_BASE_URL + "/", link)
 
     def _is_price_allowed(self, price):
         if price is None:
@@ -149,43 +685,40 @@ class WalmartSpider(scrapy.Spider):
         return self.min_price <= float(price) <= self.max_price
 
     def _required_missing(self, product):
-        required_fields = ("name", "price", "image", "link")
-        return [k for k in required_fields if not product.get(k)]
-
-    def _is_valid_product(self, product):
-        if self._required_missing(product):
-            return False
-        return self._is_price_allowed(product.get("price"))
+        # products are always ProductItem here, so read the slots directly;
+        # callers pair this list with _is_price_allowed instead of re-walking it
+        return [k for k in _REQUIRED_FIELDS if not getattr(product, k)]
 
     def _extract_images_from_response(self, response):
-        images = []
-        selectors = [
-            "img.prod-hero-image",
-            "img[itemprop='image']",
-            "ul.slider-list img",
-            "div.carousel img",
-            "div.thumbnail-list img",
-            "div.product-image-gallery img",
-        ]
-        for selector in selectors:
-            srcs = response.css(f"{selector}::attr(src)").getall()
-            srcsets = response.css(f"{selector}::attr(srcset)").getall()
-            for src in srcs:
+        # one walk for every gallery <img>; each is bucketed under the first
+        # gallery selector it matches so selector priority is preserved
+        buckets = [([], []) for _ in _GALLERY_SELECTORS]
+        for img in _GALLERY_IMG_XPATH(_node_root(response)):
+            srcs, srcsets = buckets[_gallery_priority(img)]
+            src = img.get("src")
+            if src:
+                srcs.append(src.strip())
+            url = _first_srcset_url(img.get("srcset") or "")
+            if url:
+                srcsets.append(url)
+        images = (url for srcs, srcsets in buckets for url in (*srcs, *srcsets) if url)
+        return list(dict.fromkeys(images))
+
+    def _first_image_from_response(self, response):
+        # same answer as _extract_images_from_response(...)[0], but stops at
+        # the first gallery selector (in priority order) that yields a URL
+        root = _node_root(response)
+        for xpath in _GALLERY_SELECTOR_XPATHS:
+            imgs = xpath(root)
+            for img in imgs:
+                src = (img.get("src") or "").strip()
                 if src:
-                    images.append(src.strip())
-            for srcset in srcsets:
-                if not srcset:
-                    continue
-                first = srcset.split(",")[0].strip().split(" ")[0]
-                if first:
-                    images.append(first)
-        deduped = []
-        seen = set()
-        for img in images:
-            if img and img not in seen:
-                seen.add(img)
-                deduped.append(img)
-        return deduped
+                    return src
+            for img in imgs:
+                url = _first_srcset_url(img.get("srcset") or "")
+                if url:
+                    return url
+        return None
 
     def _build_next_page_url(self, current_url):
         parsed = urlparse(current_url)
@@ -196,25 +729,82 @@ class WalmartSpider(scrapy.Spider):
         query["q"] = [self.search_term]
         return urlunparse(parsed._replace(query=urlencode(query, doseq=True))), next_page
 
+    def _shared_context_meta(self):
+        kwargs = {
+            "user_agent": self._context_ua,
+            # search tiles lay out fine at 800px; detail retries widen their page
+            "viewport": {"width": 800, "height": 900},
+        }
+        if self._storage_state:
+            kwargs["storage_state"] = self._storage_state
+        return {"playwright_context": self.PLAYWRIGHT_CONTEXT, "playwright_context_kwargs": kwargs}
+
     def _request_for_url(self, url, page_number):
-        ua = random.choice(USER_AGENTS)
         meta = {
             "playwright": True,
-            "playwright_include_page": True,
             "page_number": page_number,
             "playwright_page_methods": [
-                PageMethod("set_extra_http_headers", {"user-agent": ua}),
-                PageMethod("wait_for_selector", "div#main-content, script[id='__NEXT_DATA__']", {"timeout": 30000}),
-                PageMethod("evaluate", "window.scrollBy(0, document.body.scrollHeight)"),
-                PageMethod("wait_for_timeout", 1500),
+                # return as soon as the first product tile (or the JSON blob the
+                # JSON path reads) is in the DOM; no fixed sleeps
+                PageMethod("wait_for_selector", _FIRST_TILE_SELECTOR, state="attached", timeout=15000),
+                PageMethod("evaluate", _START_SCROLL_JS),
+                PageMethod(_wait_for_cards, self.num_products - self.results_found),
+                PageMethod("evaluate", _STOP_SCROLL_JS),
             ],
+            **self._context_meta,
         }
-        base = Path(__file__).resolve().parents[1]
-        storage_path = base / "walmart_storage.json"
-        if storage_path.exists():
-            meta["playwright_context"] = {"storageState": str(storage_path)}
-            self._log("info", "loaded storage state", storage_path=str(storage_path), page_number=page_number)
-        return scrapy.Request(url, meta=meta, headers={"User-Agent": ua}, callback=self.parse)
+        if self._storage_state:
+            self._log("info", "loaded storage state", storage_path=self._storage_state, page_number=page_number)
+        return scrapy.Request(url, meta=meta, headers=self._headers, callback=self.parse)
+
+    def _detail_request(self, link, product, card_idx, page_number, playwright=False):
+        detail_meta = {
+            # detail pages get their own bounded download slot, whose zero
+            # delay AutoThrottle would otherwise raise to the search pacing
+            "download_slot": self.DETAIL_SLOT,
+            "autothrottle_dont_adjust_delay": True,
+            "partial_item": product,
+            "card_index": card_idx,
+            "page_number": page_number,
+        }
+        # the server-rendered HTML carries the title, price meta and images, so
+        # detail pages go through Scrapy's plain HTTP handler; the browser is
+        # only a second chance when that HTML comes back without them
+        if playwright:
+            detail_meta.update(
+                playwright=True,
+                playwright_page_methods=[
+                    # scrapy-playwright has already navigated to the URL; the
+                    # wider viewport re-lays out the gallery without a reload
+                    PageMethod("set_viewport_size", {"width": 1200, "height": 900}),
+                ],
+                # reuse the shared browser context
+                **self._context_meta,
+            )
+        return scrapy.Request(
+            link,
+            callback=self.parse_product_detail,
+            headers=self._headers,
+            meta=detail_meta,
+            # the playwright retry revisits a URL the dupefilter has already seen
+            dont_filter=playwright,
+        )
+
+    def _dump_debug_html(self, response, page_number):
+        # spiders built without a crawler (tests) have no settings
+        settings = getattr(self, "settings", None)
+        if settings is None or not settings.getbool("DUMP_DEBUG_HTML"):
+            return
+        if self.debug_dumps >= self.MAX_DEBUG_DUMPS:
+            self._log("debug", "debug html dump limit reached", page_number=page_number, limit=self.MAX_DEBUG_DUMPS)
+            return
+        self.debug_dumps += 1
+        # pid + monotonic counter: unique across concurrent crawls, no datetime
+        debug_path = Path(__file__).parent.parent.parent / f"debug_failed_{os.getpid()}_{time.monotonic_ns()}.html"
+        # raw body bytes, written on a worker thread so the reactor keeps running
+        d = threads.deferToThread(debug_path.write_bytes, response.body)
+        d.addCallback(lambda _: self._log("info", "saved debug html", debug_path=str(debug_path)))
+        d.addErrback(lambda f: self._log("warning", "debug html write failed", debug_path=str(debug_path), error=str(f.value)))
 
     def _maybe_schedule_next_page(self, response):
         if self.results_found >= self.num_products:
@@ -229,7 +819,8 @@ class WalmartSpider(scrapy.Spider):
             self._log("warning", "max pages reached before target", page_number=page_number, max_pages=self.max_pages)
             return None
 
-        next_href = response.css('a[aria-label="Next Page"]::attr(href)').get()
+        next_hrefs = _NEXT_PAGE_HREF_XPATH(_node_root(response))
+        next_href = next_hrefs[0] if next_hrefs else None
         if next_href:
             next_url = self._normalize_link(next_href)
             next_page = page_number + 1
@@ -239,8 +830,49 @@ class WalmartSpider(scrapy.Spider):
         self._log("info", "requesting next page to continue filling target", next_page=next_page, next_url=next_url)
         return self._request_for_url(next_url, page_number=next_page)
 
+    def _bootstrap_storage_state(self, url):
+        """Open a headed browser until a human clears the captcha, then save its storage state.
+
+        Blocking; runs on a worker thread. sync_playwright drives its own
+        event loop there (a Proactor loop on Windows, which can spawn the
+        browser), so the reactor's loop never has to launch a subprocess.
+        """
+        from playwright.sync_api import sync_playwright
+
+        with sync_playwright() as pw:
+            browser = pw.chromium.launch(headless=False)
+            try:
+                context = browser.new_context(user_agent=self._context_ua)
+                page = context.new_page()
+                page.goto(url, wait_until="domcontentloaded", timeout=60000)
+                # same grid check as the app's interactive solve; a human has 5 minutes
+                page.wait_for_selector("div[data-item-id], div.search-result-gridview-item-wrapper", timeout=300000)
+                context.storage_state(path=str(_STORAGE_FILE))
+            finally:
+                browser.close()
+
+    async def start(self):
+        if self.bootstrap_storage and not self._storage_state:
+            url = self._first_url()
+            self._log("warning", "no storage state; solve the captcha in the opened browser", url=url, storage_path=str(_STORAGE_FILE))
+            try:
+                await maybe_deferred_to_future(threads.deferToThread(self._bootstrap_storage_state, url))
+            except Exception as e:
+                # bootstrap_storage was asked for explicitly; crawling on without
+                # the state would only collect block pages, so stop here
+                self._log("error", "storage state bootstrap failed", url=url, error=repr(e))
+                raise
+            self._storage_state = str(_STORAGE_FILE)
+            self._context_meta = self._shared_context_meta()
+            self._log("info", "storage state bootstrapped", storage_path=self._storage_state)
+        for request in self.start_requests():
+            yield request
+
+    def _first_url(self):
+        return f"{_BASE_URL}/search?q={self.search_term}&page=1"
+
     def start_requests(self):
-        first_url = f"https://www.walmart.com/search?q={self.search_term}&page=1"
+        first_url = self._first_url()
         self._log(
             "info",
             "starting search scrape",
@@ -259,23 +891,12 @@ class WalmartSpider(scrapy.Spider):
             page_number = 1
         self._log("info", "processing search response", page_number=page_number, status=getattr(response, "status", None), url=response.url)
 
-        next_data = response.xpath('//script[@id="__NEXT_DATA__"]/text()').get()
+        next_data = self._find_next_data(response)
         if next_data:
             self._log("info", "found __NEXT_DATA__ json blob", page_number=page_number)
             try:
-                data = json.loads(next_data)
-                item_stacks = (
-                    data.get("props", {})
-                    .get("pageProps", {})
-                    .get("initialData", {})
-                    .get("searchResult", {})
-                    .get("itemStacks", [])
-                )
-                items = []
-                for stack in item_stacks:
-                    items.extend(stack.get("items", []))
-                self._log("info", "json extraction candidate count", page_number=page_number, candidates=len(items))
-
+                items = self._iter_next_data_items(next_data)
+                idx = 0
                 for idx, item in enumerate(items, start=1):
                     if self.results_found >= self.num_products:
                         break
@@ -288,28 +909,34 @@ class WalmartSpider(scrapy.Spider):
                         self._log("debug", "duplicate link skipped", item_index=idx, link=link)
                         continue
 
-                    product = {
-                        "name": item.get("name"),
-                        "price": item.get("priceInfo", {}).get("currentPrice", {}).get("price"),
-                        "image": item.get("image"),
-                        "images": [item.get("image")] if item.get("image") else [],
-                        "shipping": item.get("fulfillmentLabel"),
-                        "description": item.get("description"),
-                        "link": link,
-                        "source": "json_extraction",
-                    }
-
-                    if product.get("price") is not None:
+                    price = _dig(item, "priceInfo", "currentPrice", "price")
+                    if price is not None:
                         try:
-                            product["price"] = float(product["price"])
-                            self._log("debug", "price parsed from json", item_index=idx, price=product["price"])
+                            price = float(price)
+                            self._log("debug", "price parsed from json", item_index=idx, price=price)
                         except Exception:
-                            product["price"] = self._parse_price(str(product.get("price")))
-                            self._log("debug", "price fallback parsed from json string", item_index=idx, price=product["price"])
+                            price = self._parse_price(str(price))
+                            self._log("debug", "price fallback parsed from json string", item_index=idx, price=price)
+
+                    # scalar range check before any item is built for it
+                    if not self._is_price_allowed(price):
+                        self._log("debug", "json product price missing or out of range", item_index=idx, link=link, price=price)
+                        continue
+
+                    product = ProductItem(
+                        name=item.get("name"),
+                        price=price,
+                        image=item.get("image"),
+                        images=[item.get("image")] if item.get("image") else [],
+                        shipping=item.get("fulfillmentLabel"),
+                        description=item.get("description"),
+                        link=link,
+                        source="json_extraction",
+                    )
 
                     missing = self._required_missing(product)
                     self._log("info", "json product extraction result", item_index=idx, link=product.get("link"), missing_fields=missing)
-                    if self._is_valid_product(product):
+                    if not missing:
                         self.seen_links.add(link)
                         self.results_found += 1
                         self._log("info", "json product accepted", item_index=idx, link=link)
@@ -325,6 +952,7 @@ class WalmartSpider(scrapy.Spider):
                         price=product.get("price"),
                     )
 
+                self._log("info", "json extraction candidate count", page_number=page_number, candidates=idx)
                 if self.results_found < self.num_products:
                     next_req = self._maybe_schedule_next_page(response)
                     if next_req:
@@ -334,48 +962,52 @@ class WalmartSpider(scrapy.Spider):
                 self._log("error", "json extraction failed, switching to dom", page_number=page_number, error=str(e))
 
         self._log("warning", "falling back to dom scraping", page_number=page_number)
-        product_cards = response.css("div[data-item-id]")
+        # bare lxml elements: the card loop only runs compiled XPaths, so no
+        # parsel SelectorList wrapping or per-call css translation is needed.
+        # The tree is only built here, after the JSON path (a byte scan) misses.
+        root = _node_root(response)
+        for card_src, cards_xpath in _CARD_LAYOUTS:
+            product_cards = cards_xpath(root)
+            if product_cards:
+                break
         if not product_cards:
             self._log("error", "no product cards found", page_number=page_number, url=response.url)
-            debug_path = Path(__file__).parent.parent.parent / f"debug_failed_{datetime.now().timestamp()}.html"
-            with open(debug_path, "w", encoding="utf-8") as f:
-                f.write(response.text)
-            self._log("info", "saved debug html", debug_path=str(debug_path))
+            self._dump_debug_html(response, page_number)
             return
 
         self._log("info", "dom card candidates found", page_number=page_number, candidates=len(product_cards))
-        for card_idx, card in enumerate(product_cards, start=1):
+        # prices first: a card whose known price is out of range is dropped
+        # before any other field is extracted or a detail page is requested
+        # (a missing price may still come from the detail page, so it stays)
+        candidates = []
+        price_column = self._batch_extract(root, product_cards, "price_text", self.CARD_PRICE_ATTEMPTS, card_src)
+        for card_idx, (card, (price_text, price_attempt)) in enumerate(zip(product_cards, price_column), start=1):
+            price = self._parse_price(price_text) if price_text else None
+            if price and not self._is_price_allowed(price):
+                self._log("debug", "card price outside range; skipped", card_index=card_idx, price=price)
+                continue
+            candidates.append((card_idx, card, price_attempt, price))
+
+        # one page-wide pass per selector attempt, columns indexed by candidate
+        cards = [c[1] for c in candidates]
+        columns = zip(
+            candidates,
+            self._batch_extract(root, cards, "name", self.CARD_NAME_ATTEMPTS, card_src),
+            self._batch_extract(root, cards, "image", self.CARD_IMAGE_ATTEMPTS, card_src),
+            self._batch_extract(root, cards, "link", self.CARD_LINK_ATTEMPTS, card_src),
+            self._batch_extract(root, cards, "shipping", self.CARD_SHIPPING_ATTEMPTS, card_src),
+        )
+        for (card_idx, card, price_attempt, price), name_hit, image_hit, link_hit, shipping_hit in columns:
             if self.results_found >= self.num_products:
                 break
             self.card_attempts += 1
             self._log("info", "processing product card", card_index=card_idx, card_attempt=self.card_attempts)
 
-            name_attempts = [
-                {"selector": 'span[data-automation-id="product-title"]::text', "extract": "text"},
-                {"selector": "a span.w_iUH7::text", "extract": "text"},
-                {"selector": ".f6.f5-l::text", "extract": "text"},
-            ]
-            price_attempts = [
-                {"selector": 'div[data-automation-id="product-price"] div::text', "extract": "text"},
-                {"selector": ".aa88::text", "extract": "text"},
-                {"selector": "span.price-characteristic::attr(content)", "extract": "text"},
-            ]
-            image_attempts = [
-                {"selector": 'img[data-testid="productTileImage"]', "extract": "attr", "attr": "src"},
-                {"selector": "img", "extract": "attr", "attr": "src"},
-            ]
-            link_attempts = [
-                {"selector": "a", "extract": "attr", "attr": "href"},
-            ]
-
-            name, name_attempt = self._attempt_extract(card, "name", name_attempts, card_idx=card_idx)
-            price_text, price_attempt = self._attempt_extract(card, "price_text", price_attempts, card_idx=card_idx)
-            image, image_attempt = self._attempt_extract(card, "image", image_attempts, card_idx=card_idx)
-            raw_link, link_attempt = self._attempt_extract(card, "link", link_attempts, card_idx=card_idx)
+            name, name_attempt = name_hit
+            image, image_attempt = image_hit
+            raw_link, link_attempt = link_hit
             link = self._normalize_link(raw_link)
-            shipping = self._extract_shipping(card, card_idx=card_idx)
-
-            price = self._parse_price(price_text) if price_text else None
+            shipping = self._extract_shipping(card, card_idx=card_idx, result=shipping_hit)
             self._log(
                 "info",
                 "card field extraction summary",
@@ -394,49 +1026,39 @@ class WalmartSpider(scrapy.Spider):
                 self._log("debug", "duplicate card link skipped", card_index=card_idx, link=link)
                 continue
 
-            product = {
-                "name": name.strip() if name else None,
-                "price": price,
-                "image": image,
-                "images": [image] if image else [],
-                "shipping": shipping,
-                "description": None,
-                "link": link,
-                "source": "dom_scrape",
-            }
+            product = ProductItem(
+                name=name.strip() if name else None,
+                price=price,
+                image=image,
+                images=[image] if image else [],
+                shipping=shipping,
+                description=None,
+                link=link,
+                source="dom_scrape",
+            )
             missing = self._required_missing(product)
 
-            if missing and link:
+            # only name/price gaps justify a detail fetch; an image-only gap
+            # ships as an incomplete item instead of costing a page load
+            if link and ("name" in missing or "price" in missing):
+                if link in self.detail_links:
+                    self._log("debug", "detail page already requested; card skipped", card_index=card_idx, link=link)
+                    continue
+                self.detail_links.add(link)
                 self._log("warning", "card missing required fields; requesting detail page", card_index=card_idx, link=link, missing_fields=missing)
-                detail_ua = random.choice(USER_AGENTS)
-                detail_methods = [
-                    PageMethod("set_extra_http_headers", {"user-agent": detail_ua}),
-                    PageMethod("set_viewport_size", {"width": 1200, "height": 900}),
-                    PageMethod("goto", link, {"wait_until": "domcontentloaded"}),
-                    PageMethod("wait_for_selector", "body"),
-                    PageMethod("wait_for_timeout", 500),
-                ]
-                yield scrapy.Request(
-                    link,
-                    callback=self.parse_product_detail,
-                    headers={"User-Agent": detail_ua},
-                    meta={
-                        "playwright": True,
-                        "playwright_page_methods": detail_methods,
-                        "partial_item": product,
-                        "card_index": card_idx,
-                        "page_number": page_number,
-                    },
-                )
+                yield self._detail_request(link, product, card_idx, page_number)
                 continue
 
-            if not self._is_valid_product(product):
+            if missing == ["image"] and self._is_price_allowed(price):
+                product.incomplete = True
+                product.missing_fields = missing
+            elif missing or not self._is_price_allowed(price):
                 self._log("warning", "card rejected after extraction", card_index=card_idx, link=link, missing_fields=missing, price=price)
                 continue
 
             self.seen_links.add(link)
             self.results_found += 1
-            self._log("info", "card accepted", card_index=card_idx, link=link)
+            self._log("info", "card accepted", card_index=card_idx, link=link, incomplete=product.incomplete)
             yield product
 
         if self.results_found < self.num_products:
@@ -447,47 +1069,54 @@ class WalmartSpider(scrapy.Spider):
     def parse_product_detail(self, response):
         partial = response.meta.get("partial_item", {}) or {}
         card_index = response.meta.get("card_index")
+        # the URL that was asked for, not where a redirect ended up
+        requested_url = response.meta.get("redirect_urls", [response.url])[0]
         self._log("info", "processing detail page", card_index=card_index, detail_url=response.url)
+        if _is_blocked(response):
+            # never mine a challenge page for product fields (its <h1> would
+            # become the name); the browser context gets one more try
+            if response.meta.get("playwright"):
+                self._log("warning", "detail page blocked; dropping", card_index=card_index, detail_url=requested_url)
+                return
+            self._log("info", "detail page blocked; retrying with playwright", card_index=card_index, detail_url=requested_url)
+            yield self._detail_request(
+                partial.get("link") or requested_url,
+                partial,
+                card_index,
+                response.meta.get("page_number"),
+                playwright=True,
+            )
+            return
+        # one parsed tree per response, bound once for every lookup below
+        root = _node_root(response)
 
-        name_attempts = [
-            {"selector": "h1.prod-ProductTitle::text", "extract": "text"},
-            {"selector": 'h1[itemprop="name"]::text', "extract": "text"},
-            {"selector": "h1::text", "extract": "text"},
-        ]
-        price_attempts = [
-            {"selector": "span.price-characteristic", "extract": "attr", "attr": "content"},
-            {"selector": 'meta[itemprop="price"]', "extract": "attr", "attr": "content"},
-            {"selector": "span.price::text", "extract": "text"},
-        ]
-        description_attempts = [
-            {"selector": "#product-description p::text", "extract": "text"},
-            {"selector": '[data-testid="product-description"]::text', "extract": "text"},
-            {"selector": 'meta[name="description"]', "extract": "attr", "attr": "content"},
-        ]
-        shipping_attempts = [
-            {"selector": '[data-testid="fulfillment-summary"]::text', "extract": "text"},
-            {"selector": "span:contains('shipping')::text", "extract": "text"},
-            {"selector": 'div[data-automation-id="fulfillment-badge"]::text', "extract": "text"},
-        ]
-
-        name, _ = self._attempt_extract(response, "detail_name", name_attempts, card_idx=card_index)
-        price_txt, _ = self._attempt_extract(response, "detail_price_text", price_attempts, card_idx=card_index)
-        description, _ = self._attempt_extract(response, "detail_description", description_attempts, card_idx=card_index)
-        shipping, _ = self._attempt_extract(response, "detail_shipping", shipping_attempts, card_idx=card_index)
+        name, _ = self._attempt_extract(root, "detail_name", self.DETAIL_NAME_ATTEMPTS, card_idx=card_index)
+        price_txt, _ = self._attempt_extract(root, "detail_price_text", self.DETAIL_PRICE_ATTEMPTS, card_idx=card_index)
+        description, _ = self._attempt_extract(root, "detail_description", self.DETAIL_DESCRIPTION_ATTEMPTS, card_idx=card_index)
+        shipping, _ = self._attempt_extract(root, "detail_shipping", self.DETAIL_SHIPPING_ATTEMPTS, card_idx=card_index)
 
         price = self._parse_price(price_txt) if price_txt else partial.get("price")
-        images = self._extract_images_from_response(response)
+        if self.collect_gallery:
+            images = self._extract_images_from_response(root)
+        else:
+            first = self._first_image_from_response(root)
+            images = [first] if first else []
         if not images and partial.get("images"):
             images = list(partial.get("images"))
         image = images[0] if images else partial.get("image")
 
         # JSON-LD fallback for description and shipping hints.
         try:
-            ld_nodes = response.xpath('//script[@type="application/ld+json"]/text()').getall()
+            ld_nodes = _LD_JSON_XPATH(root)
             for ld in ld_nodes:
+                if description and name:
+                    break
                 if not ld or not ld.strip():
                     continue
-                parsed = json.loads(ld)
+                # cheap substring test before paying for a full parse
+                if ('"description"' not in ld or description) and ('"name"' not in ld or name):
+                    continue
+                parsed = _json_loads(ld)
                 objects = parsed if isinstance(parsed, list) else [parsed]
                 for obj in objects:
                     if not isinstance(obj, dict):
@@ -501,23 +1130,45 @@ class WalmartSpider(scrapy.Spider):
         except Exception as e:
             self._log("warning", "json-ld parse failed on detail page", card_index=card_index, error=str(e))
 
-        merged = {
-            "name": name or partial.get("name"),
-            "price": price,
-            "image": image,
-            "images": images if images else ([image] if image else []),
-            "shipping": shipping or partial.get("shipping"),
-            "description": description or partial.get("description"),
-            "link": partial.get("link") or response.url,
-            "source": "detail_enrichment",
-        }
+        name = name or partial.get("name")
+        # the detail fetch was issued for a missing name or price (the card's
+        # values are already merged in), so either gap left here earns the
+        # browser its one second chance
+        if (not name or price is None) and not response.meta.get("playwright"):
+            self._log(
+                "info",
+                "static detail page lacks name or price; retrying with playwright",
+                card_index=card_index,
+                detail_url=requested_url,
+                name_ok=bool(name),
+                price_ok=price is not None,
+            )
+            yield self._detail_request(
+                partial.get("link") or requested_url,
+                partial,
+                card_index,
+                response.meta.get("page_number"),
+                playwright=True,
+            )
+            return
+
+        merged = ProductItem(
+            name=name,
+            price=price,
+            image=image,
+            images=images if images else ([image] if image else []),
+            shipping=shipping or partial.get("shipping"),
+            description=description or partial.get("description"),
+            link=partial.get("link") or requested_url,
+            source="detail_enrichment",
+            detail_url=response.url,
+        )
 
         missing = self._required_missing(merged)
-        merged["incomplete"] = bool(missing)
-        merged["missing_fields"] = missing
-        merged["detail_url"] = response.url
+        merged.incomplete = bool(missing)
+        merged.missing_fields = missing
 
-        if not self._is_valid_product(merged):
+        if missing or not self._is_price_allowed(merged.price):
             self._log("warning", "detail page product rejected", card_index=card_index, link=merged.get("link"), missing_fields=missing, price=merged.get("price"))
             return
 